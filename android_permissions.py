@@ -149,7 +149,8 @@ class AndroidPermissionManager:
             for package in packages:
                 app_info = {
                     "name": str(package.applicationInfo.loadLabel(pm)),
-                    "package": str(package.packageName)
+                    "package": str(package.packageName),
+                    "version_code": int(package.versionCode)
                 }
                 apps.append(app_info)
             
@@ -158,6 +159,37 @@ class AndroidPermissionManager:
         except Exception as e:
             print(f"获取应用列表失败: {e}")
             return []
+    
+    def load_app_icon(self, package_name, size=96):
+        """读取应用图标并编码为PNG字节，失败时返回None"""
+        if not ANDROID_AVAILABLE:
+            return None
+        
+        try:
+            PythonActivity = autoclass('org.kivy.android.PythonActivity')
+            Bitmap = autoclass('android.graphics.Bitmap')
+            BitmapConfig = autoclass('android.graphics.Bitmap$Config')
+            CompressFormat = autoclass('android.graphics.Bitmap$CompressFormat')
+            Canvas = autoclass('android.graphics.Canvas')
+            ByteArrayOutputStream = autoclass('java.io.ByteArrayOutputStream')
+            
+            pm = PythonActivity.mActivity.getPackageManager()
+            drawable = pm.getApplicationIcon(package_name)
+            
+            # 把图标绘制到固定尺寸的位图上再压缩
+            bitmap = Bitmap.createBitmap(size, size, BitmapConfig.ARGB_8888)
+            canvas = Canvas(bitmap)
+            drawable.setBounds(0, 0, size, size)
+            drawable.draw(canvas)
+            
+            stream = ByteArrayOutputStream()
+            bitmap.compress(CompressFormat.PNG, 100, stream)
+            bitmap.recycle()
+            return bytes(stream.toByteArray())
+            
+        except Exception as e:
+            print(f"读取应用图标失败 {package_name}: {e}")
+            return None
 
 class PhoneCallManager:
     """电话功能管理器"""
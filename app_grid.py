@@ -0,0 +1,187 @@
+"""
+应用网格模块
+AppLauncherView: 基于 RecycleView 的虚拟化启动器，只为可见行创建控件并在滚动时复用，
+适合 get_installed_apps() 返回的完整应用列表；每个应用的行数据只创建一次，
+状态变化时只替换受影响的行
+IconAtlas: 从构建时生成的图集中取图标纹理
+"""
+
+import os
+
+from kivy.atlas import Atlas
+from kivy.metrics import dp, Metrics
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.image import Image
+from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recyclegridlayout import RecycleGridLayout
+
+from icon_atlas import atlas_file, icon_key, pick_size
+
+# 格子颜色
+COLOR_CALL = (0.2, 0.8, 0.2, 1)      # 绿色 - 通话应用
+COLOR_BLOCKED = (0.5, 0.5, 0.5, 1)   # 灰色 - 禁用
+COLOR_NORMAL = (0.4, 0.6, 0.9, 1)    # 蓝色 - 普通应用
+
+
+class IconAtlas:
+    """按屏幕密度选择图集，所有图标共用一张纹理
+
+    图集文件不存在时 texture() 始终返回None，格子不显示图标。
+    """
+
+    def __init__(self, icon_size=48, project_dir=None):
+        path = atlas_file(pick_size(icon_size * Metrics.density), project_dir)
+        self.atlas = None
+        if os.path.exists(path):
+            try:
+                self.atlas = Atlas(path)
+            except Exception as e:
+                print(f"加载图标图集失败: {e}")
+
+    def texture(self, icon):
+        if self.atlas is None or not icon:
+            return None
+        return self.atlas.textures.get(icon_key(icon))
+
+
+class AppTileView(RecycleDataViewBehavior, BoxLayout):
+    """RecycleView 复用的应用格子，内容来自 data 中的字典"""
+
+    def __init__(self, **kwargs):
+        super(AppTileView, self).__init__(orientation='vertical', spacing=2, **kwargs)
+        self.app_name = ""
+        self.on_open = None
+        self.package = None
+        # 没有图标时高度为0，不占位置
+        self.icon = Image(size_hint=(1, 0), allow_stretch=True)
+        self.add_widget(self.icon)
+        self.button = Button(size_hint=(1, 0.8))
+        self.button.bind(on_press=self._on_press)
+        self.add_widget(self.button)
+        self.label = Label(size_hint=(1, 0.2), font_size='10sp', color=(0.5, 0.5, 0.5, 1))
+        self.add_widget(self.label)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """复用控件时填入新的应用数据"""
+        self.app_name = data["name"]
+        self.on_open = data["on_open"]
+        self.button.text = data["name"]
+        self.button.background_color = data["color"]
+        self.label.text = data["category"]
+        self.package = data.get("package")
+        self._show_icon(data.get("icon"))
+        icon_cache = data.get("icon_cache")
+        if data.get("icon") is None and icon_cache is not None and self.package:
+            package = self.package
+            icon_cache.request(
+                package,
+                data.get("version_code", 0),
+                lambda texture: self._on_icon_loaded(package, texture)
+            )
+        font_name = data.get("font_name")
+        if font_name:
+            self.button.font_name = font_name
+            self.label.font_name = font_name
+
+    def _show_icon(self, texture):
+        self.icon.texture = texture
+        self.icon.size_hint_y = 0.4 if texture is not None else 0
+
+    def _on_icon_loaded(self, package, texture):
+        # 格子可能已被复用给其他应用
+        if package == self.package:
+            self._show_icon(texture)
+
+    def _on_press(self, instance):
+        if self.on_open:
+            self.on_open(self.app_name)
+
+
+class AppLauncherView(RecycleView):
+    """虚拟化的应用启动器
+
+    每个应用的行数据按应用名缓存，内容不变时复用同一个字典。
+    sync() 只在可见应用或颜色变化时修改 data：显示的应用不变时逐行替换变化的行，
+    RecycleView 只刷新这些行；显示的应用增减时才替换整个列表。
+    """
+
+    def __init__(self, on_open, cols=3, row_height=72, font_name=None, icons=None,
+                 icon_cache=None, **kwargs):
+        super(AppLauncherView, self).__init__(**kwargs)
+        self.on_open = on_open
+        self.font_name = font_name
+        self.icons = icons
+        self.icon_cache = icon_cache
+        self.viewclass = AppTileView
+        layout = RecycleGridLayout(
+            cols=cols,
+            spacing=5,
+            default_size=(None, dp(row_height)),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        self.layout_manager = layout
+        self._rows = ()
+        # 应用名 -> (行内容, 行数据字典)
+        self._row_cache = {}
+        self.changes = 0
+
+    def sync(self, apps, tile_state):
+        """按 tile_state(app) -> (是否显示, 颜色) 更新数据，返回变化的行数"""
+        rows = []
+        for app in apps:
+            visible, color = tile_state(app)
+            if visible:
+                rows.append((app.name, app.category, color, app.icon,
+                             getattr(app, "package", None), getattr(app, "version_code", 0)))
+        rows = tuple(rows)
+        previous = self._rows
+        if rows == previous:
+            return 0
+
+        if len(self._row_cache) > len(apps):
+            # 应用被卸载，释放不再存在的行
+            names = {app.name for app in apps}
+            self._row_cache = {name: entry for name, entry in self._row_cache.items()
+                               if name in names}
+        changed = [index for index, (old, new) in enumerate(zip(previous, rows)) if old != new]
+        same_names = len(rows) == len(previous) and all(
+            previous[index][0] == rows[index][0] for index in changed
+        )
+        if same_names:
+            # 显示的应用不变，只替换变化的行
+            for index in changed:
+                self.data[index] = self._cached_row(rows[index])
+            changes = len(changed)
+        else:
+            self.data = [self._cached_row(row) for row in rows]
+            changes = abs(len(rows) - len(previous)) + len(changed)
+        self._rows = rows
+        self.changes += changes
+        return changes
+
+    def _cached_row(self, row):
+        """行内容不变时复用原来的字典"""
+        entry = self._row_cache.get(row[0])
+        if entry is None or entry[0] != row:
+            entry = (row, self._row_data(*row))
+            self._row_cache[row[0]] = entry
+        return entry[1]
+
+    def _row_data(self, name, category, color, icon, package, version_code):
+        data = {"name": name, "category": category, "color": color, "on_open": self.on_open}
+        if self.icons is not None:
+            data["icon"] = self.icons.texture(icon)
+        if package and self.icon_cache is not None:
+            # 图集中没有的图标由图标服务在后台加载
+            data["package"] = package
+            data["version_code"] = version_code
+            data["icon_cache"] = self.icon_cache
+        if self.font_name:
+            data["font_name"] = self.font_name
+        return data
@@ -0,0 +1,107 @@
+"""
+应用网格更新基准测试
+比较 clear_widgets() 整体重建和 AppLauncherView 增量更新在不同应用数量下的状态切换耗时，
+以及 AppLauncherView 首次显示的耗时和实际创建的格子数
+
+用法: python benchmark_app_grid.py
+"""
+
+import os
+import time
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.gridlayout import GridLayout
+
+from app_grid import AppLauncherView, COLOR_CALL, COLOR_BLOCKED, COLOR_NORMAL
+
+CATEGORIES = ["通讯", "社交", "媒体", "娱乐", "工具", "系统"]
+
+
+class BenchApp:
+    def __init__(self, index):
+        self.name = f"应用{index}"
+        self.category = CATEGORIES[index % len(CATEGORIES)]
+        self.is_call_related = index < 2
+        self.icon = "app.png"
+
+
+def tile_state(time_up, blocked=False):
+    def state(app):
+        if app.is_call_related:
+            return True, COLOR_CALL
+        if time_up:
+            return False, None
+        return True, COLOR_BLOCKED if blocked else COLOR_NORMAL
+    return state
+
+
+def rebuild(grid, apps, time_up):
+    """原来的做法：清空后逐个重建"""
+    grid.clear_widgets()
+    for app in apps:
+        if time_up and not app.is_call_related:
+            continue
+        app_layout = BoxLayout(orientation='vertical', spacing=2)
+        app_button = Button(text=app.name, size_hint=(1, 0.8))
+        app_button.background_color = COLOR_CALL if app.is_call_related else COLOR_NORMAL
+        app_button.bind(on_press=lambda btn, app_name=app.name: None)
+        app_layout.add_widget(app_button)
+        app_layout.add_widget(Label(text=app.category, size_hint=(1, 0.2), font_size='10sp'))
+        grid.add_widget(app_layout)
+
+
+def measure(count, rounds=10):
+    """返回 (重建平均ms, 显示切换平均ms, 改色平均ms)
+
+    显示切换为时间用完时隐藏普通应用，改色为时段限制时置灰普通应用。
+    """
+    apps = [BenchApp(i) for i in range(count)]
+
+    grid = GridLayout(cols=3)
+    rebuild(grid, apps, False)
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        rebuild(grid, apps, i % 2 == 0)
+    rebuild_ms = (time.perf_counter() - t0) / rounds * 1000
+
+    view = AppLauncherView(lambda name: None, size=(360, 640), size_hint=(None, None))
+    view.sync(apps, tile_state(False))
+    view.refresh_views()
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        view.sync(apps, tile_state(i % 2 == 0))
+        view.refresh_views()
+    toggle_ms = (time.perf_counter() - t0) / rounds * 1000
+
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        view.sync(apps, tile_state(False, blocked=i % 2 == 0))
+        view.refresh_views()
+    recolor_ms = (time.perf_counter() - t0) / rounds * 1000
+    return rebuild_ms, toggle_ms, recolor_ms
+
+
+def measure_launcher(count):
+    """返回 (首次显示ms, 创建的格子数)"""
+    apps = [BenchApp(i) for i in range(count)]
+    t0 = time.perf_counter()
+    view = AppLauncherView(lambda name: None, size=(360, 640), size_hint=(None, None))
+    view.sync(apps, tile_state(False))
+    view.refresh_views()
+    first_paint_ms = (time.perf_counter() - t0) * 1000
+    return first_paint_ms, len(view.layout_manager.children)
+
+
+if __name__ == '__main__':
+    print(f"{'应用数':>6} {'整体重建(ms)':>12} {'显示切换(ms)':>12} {'改色(ms)':>10} "
+          f"{'虚拟列表首屏(ms)':>16} {'格子数':>6}")
+    for count in (12, 50, 200, 500, 1000):
+        rebuild_ms, toggle_ms, recolor_ms = measure(count)
+        first_paint_ms, views = measure_launcher(count)
+        print(f"{count:>6} {rebuild_ms:>12.2f} {toggle_ms:>12.2f} {recolor_ms:>10.2f} "
+              f"{first_paint_ms:>16.2f} {views:>6}")
\ No newline at end of file
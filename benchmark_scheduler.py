@@ -0,0 +1,89 @@
+"""
+多会话调度器基准测试
+模拟大量会话在一天内的开始/暂停操作，统计截止事件处理耗时
+
+用法: python benchmark_scheduler.py [会话数]
+"""
+
+import random
+import sys
+import time
+
+from session_scheduler import SessionScheduler
+from usage_account import NS_PER_SECOND
+
+DAY_SECONDS = 24 * 3600
+
+
+class SimulatedClock:
+    """基准测试使用的可手动推进的时钟"""
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def __call__(self):
+        return self.now_ns
+
+
+def build_script(session_count, windows_per_session, rng):
+    """生成一天内的开始/暂停操作，按时间排序"""
+    script = []
+    for session_id in range(session_count):
+        starts = sorted(rng.randrange(DAY_SECONDS) for _ in range(windows_per_session))
+        for start in starts:
+            length = rng.randrange(5 * 60, 90 * 60)
+            script.append((start * NS_PER_SECOND, 0, session_id))
+            script.append((min(start + length, DAY_SECONDS - 1) * NS_PER_SECOND, 1, session_id))
+    script.sort()
+    return script
+
+
+def run(session_count=100000, windows_per_session=3, seed=1):
+    """运行基准测试"""
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    counts = {"warning": 0, "expire": 0}
+
+    def on_warning(session):
+        counts["warning"] += 1
+
+    def on_expire(session):
+        counts["expire"] += 1
+
+    scheduler = SessionScheduler(on_warning=on_warning, on_expire=on_expire, clock=clock)
+    for session_id in range(session_count):
+        scheduler.add_session(
+            session_id,
+            rng.randrange(5, 181) * 60,
+            rng.randrange(1, 16) * 60
+        )
+
+    t0 = time.perf_counter()
+    script = build_script(session_count, windows_per_session, rng)
+    build_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for at_ns, action, session_id in script:
+        clock.now_ns = at_ns
+        scheduler.advance(at_ns)
+        if action == 0:
+            scheduler.start(session_id)
+        else:
+            scheduler.pause(session_id)
+    clock.now_ns = DAY_SECONDS * NS_PER_SECOND
+    scheduler.advance()
+    run_time = time.perf_counter() - t0
+
+    fired = counts["warning"] + counts["expire"]
+    operations = len(script) + fired
+    print(f"会话数: {session_count}")
+    print(f"脚本操作: {len(script)} (生成耗时 {build_time:.2f}s)")
+    print(f"触发事件: 警告 {counts['warning']}, 到时 {counts['expire']}")
+    print(f"模拟一天耗时: {run_time:.2f}s, 平均每次操作 {run_time / operations * 1e6:.2f}us")
+    print(f"对比: 每秒轮询所有会话需要 {session_count * DAY_SECONDS:,} 次检查")
+    return run_time
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    run(count)
\ No newline at end of file
@@ -8,6 +8,8 @@ import sys
 import subprocess
 import shutil
 from pathlib import Path
+from font_subset import build_subset_font
+from icon_atlas import build_icon_atlases
 
 class AndroidBuilder:
     """Android应用构建器"""
@@ -69,6 +71,13 @@ class AndroidBuilder:
             shutil.copy2("phone_time_limiter_enhanced.py", "main.py")
             print("✓ 创建main.py")
         
+        # 按main.py中的界面文字裁剪中文字体
+        if build_subset_font(main_file, self.project_dir, os.environ.get("LIMITER_FONT_SOURCE")) is None:
+            print("警告: 未生成裁剪字体，中文可能显示为方框")
+        
+        # 把应用图标打包成各屏幕密度的图集
+        build_icon_atlases(self.project_dir)
+        
         # 检查图标文件
         if not (self.project_dir / "icon.png").exists():
             print("警告: 未找到icon.png，将使用默认图标")
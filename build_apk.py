@@ -74,7 +74,6 @@ import time
 import threading
 import json
 import os
-from datetime import datetime, timedelta
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
@@ -88,6 +87,7 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.graphics import Color, Rectangle
 from kivy.uix.switch import Switch
+from timer_engine import TimerEngine
 
 # Android权限检查
 try:
@@ -203,11 +203,16 @@ class MainScreen(Screen):
         
         # 初始化状态
         self.time_limit = self.settings.config["time_limit_minutes"] * 60
-        self.time_remaining = self.time_limit
-        self.timer_running = False
-        self.start_time = None
-        self.warning_shown = False
+        self.refresh_interval = self.settings.config.get("refresh_seconds", 1)
         self.time_up = False
+        self.engine = TimerEngine(
+            self.time_limit,
+            self.settings.config["warning_minutes"] * 60,
+            on_warning=self.on_time_warning,
+            on_expire=self.on_time_expired,
+            on_tick=self.update_ui,
+            tick_interval=self.refresh_interval
+        )
         
         # 创建应用列表
         self.apps = [
@@ -226,7 +231,6 @@ class MainScreen(Screen):
         ]
         
         self.build_ui()
-        Clock.schedule_interval(self.update_ui, 1)
     
     def build_ui(self):
         """构建用户界面"""
@@ -427,9 +431,8 @@ class MainScreen(Screen):
     
     def start_timer(self, instance):
         """开始计时"""
-        if not self.timer_running:
-            self.timer_running = True
-            self.start_time = datetime.now()
+        if not self.engine.running and not self.time_up:
+            self.engine.start()
             self.start_button.text = "运行中"
             self.start_button.disabled = True
             self.pause_button.disabled = False
@@ -437,7 +440,7 @@ class MainScreen(Screen):
     
     def pause_timer(self, instance):
         """暂停计时"""
-        self.timer_running = False
+        self.engine.pause()
         self.start_button.text = "继续"
         self.start_button.disabled = False
         self.pause_button.disabled = True
@@ -445,10 +448,8 @@ class MainScreen(Screen):
     
     def reset_timer(self, instance):
         """重置计时器"""
-        self.timer_running = False
-        self.time_remaining = self.time_limit
-        self.warning_shown = False
         self.time_up = False
+        self.engine.reset(self.time_limit)
         self.start_button.text = "开始限时"
         self.start_button.disabled = False
         self.pause_button.disabled = True
@@ -459,36 +460,31 @@ class MainScreen(Screen):
         if hasattr(self, 'android_controller'):
             print("解除应用限制")
     
-    def update_ui(self, dt):
-        """更新UI"""
-        if self.timer_running:
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            self.time_remaining = max(0, self.time_limit - elapsed)
-            
-            warning_threshold = self.settings.config["warning_minutes"] * 60
-            if self.time_remaining <= warning_threshold and not self.warning_shown:
-                self.warning_shown = True
-                self.show_popup("时间警告", f"还剩 {self.settings.config['warning_minutes']} 分钟使用时间！")
-            
-            if self.time_remaining <= 0 and not self.time_up:
-                self.time_up = True
-                self.timer_running = False
-                
-                # 启用Android限制
-                if hasattr(self, 'android_controller'):
-                    self.android_controller.allow_calls_only()
-                
-                self.show_popup("时间到", "使用时间已结束！\\n现在只能使用通话功能。", show_password=True)
-                self.update_app_grid()
+    def on_time_warning(self):
+        """到达警告阈值"""
+        self.show_popup("时间警告", f"还剩 {self.settings.config['warning_minutes']} 分钟使用时间！")
+    
+    def on_time_expired(self):
+        """使用时间用完"""
+        self.time_up = True
         
+        # 启用Android限制
+        if hasattr(self, 'android_controller'):
+            self.android_controller.allow_calls_only()
+        
+        self.show_popup("时间到", "使用时间已结束！\\n现在只能使用通话功能。", show_password=True)
+        self.update_app_grid()
+    
+    def update_ui(self, remaining):
+        """更新UI"""
         # 更新时间显示
-        minutes = int(self.time_remaining // 60)
-        seconds = int(self.time_remaining % 60)
+        minutes = int(remaining // 60)
+        seconds = int(remaining % 60)
         self.time_label.text = f"剩余时间: {minutes:02d}:{seconds:02d}"
         
         # 更新进度条
         if self.time_limit > 0:
-            progress = self.time_remaining / self.time_limit
+            progress = remaining / self.time_limit
             bar_length = 20
             filled = int(progress * bar_length)
             bar = "█" * filled + "░" * (bar_length - filled)
@@ -505,7 +501,7 @@ class MainScreen(Screen):
         if self.time_up:
             self.status_label.text = "限制模式 - 仅通话功能"
             self.status_label.color = (0.9, 0.2, 0.2, 1)
-        elif self.timer_running:
+        elif self.engine.running:
             self.status_label.text = "计时中..."
             self.status_label.color = (0.2, 0.7, 0.2, 1)
         else:
@@ -661,13 +657,20 @@ class PhoneTimeLimiterApp(App):
         self.title = "手机时间限制器"
         
         sm = ScreenManager()
-        main_screen = MainScreen()
+        self.main_screen = MainScreen()
         settings_screen = SettingsScreen()
         
-        sm.add_widget(main_screen)
+        sm.add_widget(self.main_screen)
         sm.add_widget(settings_screen)
         
         return sm
+    
+    def on_pause(self):
+        self.main_screen.engine.set_tick_interval(0)
+        return True
+    
+    def on_resume(self):
+        self.main_screen.engine.set_tick_interval(self.main_screen.refresh_interval)
 
 if __name__ == '__main__':
     PhoneTimeLimiterApp().run()
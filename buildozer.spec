@@ -13,7 +13,7 @@ package.domain = com.example
 source.dir = .
 
 # (list) 源码包含的文件模式
-source.include_exts = py,png,jpg,kv,atlas
+source.include_exts = py,png,jpg,kv,atlas,ttf
 
 # (str) 应用版本
 version = 1.0
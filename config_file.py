@@ -0,0 +1,220 @@
+"""
+配置文件持久化模块
+配置带代数和校验和写入：先写临时文件并 fsync，再改名替换，
+上一代完好的文件保留为 .bak；读取时发现损坏会恢复上一代，而不是悄悄回到默认值。
+写入在后台线程中进行，短时间内的多次保存合并为一次写入
+"""
+
+import json
+import os
+import threading
+import zlib
+
+BACKUP_SUFFIX = ".bak"
+CORRUPT_SUFFIX = ".corrupt"
+
+
+class ConfigCorrupted(ValueError):
+    """配置文件内容不完整或校验失败"""
+
+
+def _checksum(config):
+    payload = json.dumps(config, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return f"{zlib.crc32(payload.encode('utf-8')):08x}"
+
+
+def encode_config(config, generation):
+    """打包为带代数和校验和的JSON字节"""
+    document = {
+        "generation": generation,
+        "checksum": _checksum(config),
+        "config": config,
+    }
+    return json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode_config(data):
+    """解析配置文件内容，返回 (代数, 配置)
+
+    没有校验和的旧版配置文件按第0代读取。
+    """
+    try:
+        document = json.loads(data.decode('utf-8'))
+    except ValueError as e:
+        raise ConfigCorrupted(f"无法解析: {e}")
+    if not isinstance(document, dict):
+        raise ConfigCorrupted("格式错误")
+    if "checksum" not in document:
+        return 0, document
+    config = document.get("config")
+    if not isinstance(config, dict) or document["checksum"] != _checksum(config):
+        raise ConfigCorrupted("校验和不匹配")
+    generation = document.get("generation", 0)
+    if isinstance(generation, bool) or not isinstance(generation, int) or generation < 0:
+        raise ConfigCorrupted(f"代数无效: {generation!r}")
+    return generation, config
+
+
+def read_file(path, parse=None):
+    """只读取主文件，不存在时抛出 FileNotFoundError，损坏时抛出 ConfigCorrupted
+
+    parse 用于校验并转换配置内容，它抛出的 ValueError 同样视为文件损坏。
+    """
+    with open(path, 'rb') as f:
+        generation, config = decode_config(f.read())
+    if parse:
+        try:
+            config = parse(config)
+        except ValueError as e:
+            raise ConfigCorrupted(f"内容无效: {e}")
+    return generation, config
+
+
+def read_config(path, parse=None):
+    """读取配置，返回 (代数, 配置)，文件不存在时返回 (0, None)
+
+    主文件损坏或未通过 parse 校验时改名为 .corrupt 保留现场，并从 .bak 恢复上一代。
+    """
+    backup = path + BACKUP_SUFFIX
+    try:
+        return read_file(path, parse)
+    except FileNotFoundError:
+        # 改名替换的间隙被中断时只剩备份
+        pass
+    except (OSError, ConfigCorrupted) as e:
+        print(f"配置文件损坏: {e}")
+        try:
+            os.replace(path, path + CORRUPT_SUFFIX)
+        except OSError:
+            pass
+
+    try:
+        generation, config = read_file(backup, parse)
+    except FileNotFoundError:
+        return 0, None
+    except (OSError, ConfigCorrupted) as e:
+        print(f"备份配置也已损坏，使用默认配置: {e}")
+        return 0, None
+    print(f"已从备份恢复第 {generation} 代配置")
+    return generation, config
+
+
+def write_atomic(path, data, keep_backup=True):
+    """写临时文件、fsync 后改名替换，原文件保留为 .bak"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    if keep_backup and os.path.exists(path):
+        os.replace(path, path + BACKUP_SUFFIX)
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def _fsync_dir(path):
+    """让改名操作本身落盘，不支持目录 fsync 的平台上跳过"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ConfigWriter:
+    """后台配置写入器
+
+    save() 只复制一份配置并唤醒写线程，立即返回；
+    写线程等到 delay 秒内没有新的保存后才写盘，连续保存只写最后一份。
+    """
+
+    def __init__(self, path, generation=0, delay=0.5):
+        self.path = path
+        self.generation = generation
+        self.delay = delay
+        self.writes = 0
+        self.coalesced = 0
+        self._pending = None
+        self._writing = False
+        # 最近一次写完的和正在写的内容，用于区分文件变化是否来自自己
+        self._written = None
+        self._in_flight = None
+        self._condition = threading.Condition()
+        self._worker = None
+
+    @property
+    def busy(self):
+        """还有未写完的配置"""
+        with self._condition:
+            return self._pending is not None or self._writing
+
+    def wrote(self, config):
+        """config 是否为本写入器最近写入、正在写入或等待写入的内容"""
+        with self._condition:
+            return config is not None and config in (self._written, self._in_flight, self._pending)
+
+    def save(self, config):
+        """提交一份配置，由后台线程写入"""
+        snapshot = json.loads(json.dumps(config))
+        with self._condition:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = snapshot
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout=2.0):
+        """立即写入尚未保存的配置并等待完成（on_pause / on_stop 时调用）"""
+        with self._condition:
+            self._condition.notify_all()
+            if self._pending is None and not self._writing:
+                return True
+        # 不等防抖间隔，直接在调用线程中写入
+        self._write_pending()
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._writing, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None)
+                # 防抖：等到 delay 秒内没有新的保存
+                while True:
+                    snapshot = self._pending
+                    self._condition.wait(self.delay)
+                    if self._pending is snapshot:
+                        break
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._condition:
+            if self._pending is None or self._writing:
+                return
+            config = self._pending
+            self._pending = None
+            self._writing = True
+            self._in_flight = config
+            generation = self.generation + 1
+        written = False
+        try:
+            write_atomic(self.path, encode_config(config, generation))
+            self.generation = generation
+            self.writes += 1
+            written = True
+        except Exception as e:
+            print(f"保存配置失败: {e}")
+        finally:
+            with self._condition:
+                if written:
+                    self._written = config
+                self._in_flight = None
+                self._writing = False
+                self._condition.notify_all()
\ No newline at end of file
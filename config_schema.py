@@ -0,0 +1,286 @@
+"""
+配置结构模块
+配置文件记录结构版本，旧版本在读取时逐级迁移；
+每一项在读取时检查一次类型和范围，之后界面和计时逻辑直接读属性。
+一个文件中可以保存多套命名的配置方案
+"""
+
+import math
+
+from weekly_schedule import WeeklySchedule
+
+SCHEMA_VERSION = 1
+DEFAULT_PROFILE = "default"
+
+# 名称, 类型, 默认值, 最小值, 最大值
+FIELDS = (
+    ("time_limit_minutes", int, 30, 5, 180),
+    ("warning_minutes", int, 5, 1, 15),
+    ("password", str, "1234", None, None),
+    ("auto_start", bool, False, None, None),
+    ("strict_mode", bool, True, None, None),
+    ("refresh_seconds", float, 1.0, 0.1, 60.0),
+    ("idle_refresh_seconds", float, 5.0, 0.0, 300.0),
+    ("idle_after_seconds", float, 10.0, 1.0, 3600.0),
+    ("idle_fps", int, 2, 1, 60),
+    ("show_installed_apps", bool, False, None, None),
+    ("perf_overlay", bool, False, None, None),
+    ("debug_tick_stats", bool, False, None, None),
+    ("watch_config", bool, False, None, None),
+    ("watch_poll_seconds", float, 2.0, 0.5, 3600.0),
+    ("category_limits", dict, None, None, None),
+    ("app_limits", dict, None, None, None),
+    ("schedule_rules", list, None, None, None),
+    ("schedule_overrides", dict, None, None, None),
+)
+FIELD_NAMES = tuple(field[0] for field in FIELDS)
+
+
+class ConfigInvalid(ValueError):
+    """配置文件的整体结构无效（不是字典、版本号无效等），无法逐项校验"""
+
+
+def _coerce(value, kind, default, minimum, maximum):
+    """转换为字段类型并限制在范围内，无法转换时抛出 ValueError"""
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        if value in (0, 1):
+            return bool(value)
+        raise ValueError(f"应为布尔值: {value!r}")
+    if kind in (int, float):
+        if isinstance(value, bool):
+            raise ValueError(f"应为数字: {value!r}")
+        try:
+            value = kind(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"应为数字: {value!r}")
+        if not math.isfinite(value):
+            raise ValueError(f"应为有限的数字: {value!r}")
+        if minimum is not None:
+            value = max(minimum, value)
+        if maximum is not None:
+            value = min(maximum, value)
+        return value
+    if kind is str:
+        if not isinstance(value, str):
+            raise ValueError(f"应为字符串: {value!r}")
+        return value
+    if not isinstance(value, kind):
+        raise ValueError(f"应为{kind.__name__}: {value!r}")
+    return value
+
+
+def _check_limits(limits):
+    """配额：名称 -> 非负分钟数"""
+    clean, problems = {}, []
+    for name, minutes in limits.items():
+        try:
+            if isinstance(minutes, bool):
+                raise ValueError
+            value = float(minutes)
+            if value < 0 or not math.isfinite(value):
+                raise ValueError
+        except (TypeError, ValueError):
+            problems.append(f"{name}: {minutes!r}")
+            continue
+        clean[str(name)] = int(value) if value.is_integer() else value
+    return clean, problems
+
+
+def _check_rule(rule):
+    if not isinstance(rule, dict):
+        raise ValueError("应为字典")
+    days = rule.get("days", range(7))
+    if (not isinstance(days, (list, range))
+            or not all(isinstance(day, int) and not isinstance(day, bool) and 0 <= day <= 6
+                       for day in days)):
+        raise ValueError(f"days 应为 0-6 的列表: {days!r}")
+
+
+def _check_rules(rules):
+    """每周规则：逐条编译一次，无法编译的丢弃"""
+    clean, problems = [], []
+    for rule in rules:
+        try:
+            _check_rule(rule)
+            WeeklySchedule([rule])
+        except Exception as e:
+            problems.append(f"{rule!r} ({e})")
+            continue
+        clean.append(rule)
+    return clean, problems
+
+
+def _check_overrides(overrides):
+    """日期覆盖：逐日编译一次，无法编译的日期丢弃"""
+    clean, problems = {}, []
+    for date, day_rules in overrides.items():
+        try:
+            if not isinstance(day_rules, list):
+                raise ValueError("应为列表")
+            for rule in day_rules:
+                _check_rule(rule)
+            WeeklySchedule(None, {date: day_rules})
+        except Exception as e:
+            problems.append(f"{date} ({e})")
+            continue
+        clean[date] = day_rules
+    return clean, problems
+
+
+# 容器类型之外还要检查内容的项，返回 (保留的内容, 丢弃的条目)
+CONTENT_CHECKS = {
+    "category_limits": _check_limits,
+    "app_limits": _check_limits,
+    "schedule_rules": _check_rules,
+    "schedule_overrides": _check_overrides,
+}
+
+
+def _default(kind, default):
+    # 字典和列表的默认值每次新建，避免多个配置共用一个对象
+    return kind() if default is None else default
+
+
+class LimiterConfig:
+    """一套已校验的配置，各项为普通属性
+
+    修改通过 replace() 得到新对象，原对象不变。
+    文件中不认识的键原样保留在 extra 中，写回时不会丢失。
+    """
+
+    __slots__ = FIELD_NAMES + ("extra",)
+
+    def __init__(self, values=None):
+        values = values or {}
+        problems = []
+        for name, kind, default, minimum, maximum in FIELDS:
+            if name in values:
+                try:
+                    value = _coerce(values[name], kind, default, minimum, maximum)
+                except ValueError as e:
+                    problems.append(f"{name} {e}")
+                else:
+                    check = CONTENT_CHECKS.get(name)
+                    if check:
+                        value, dropped = check(value)
+                        if dropped:
+                            print(f"配置项 {name} 中的无效条目已丢弃: " + "; ".join(dropped))
+                    setattr(self, name, value)
+                    continue
+            setattr(self, name, _default(kind, default))
+        self.extra = {key: value for key, value in values.items() if key not in FIELD_NAMES}
+        if problems:
+            print("配置项无效，已使用默认值: " + "; ".join(problems))
+
+    def get(self, key, default=None):
+        """按键名读取，供 tick_stats.is_enabled 等接受字典的函数使用"""
+        return getattr(self, key, default) if key in FIELD_NAMES else self.extra.get(key, default)
+
+    def to_dict(self):
+        data = dict(self.extra)
+        for name in FIELD_NAMES:
+            data[name] = getattr(self, name)
+        return data
+
+    def replace(self, changes):
+        """返回应用修改后的新配置"""
+        data = self.to_dict()
+        data.update(changes)
+        return LimiterConfig(data)
+
+    def diff(self, other):
+        """与另一套配置不同的键"""
+        changed = {name for name in FIELD_NAMES if getattr(self, name) != getattr(other, name)}
+        for key in set(self.extra) | set(other.extra):
+            if self.extra.get(key) != other.extra.get(key):
+                changed.add(key)
+        return changed
+
+
+def _migrate_flat(raw):
+    """版本0：没有版本号，整个文件就是一套配置"""
+    return {
+        "schema_version": 1,
+        "active_profile": DEFAULT_PROFILE,
+        "profiles": {DEFAULT_PROFILE: raw},
+    }
+
+
+# 旧版本号 -> 升级到下一版本的函数
+MIGRATIONS = {
+    0: _migrate_flat,
+}
+
+
+def migrate(raw):
+    """把任意版本的配置文件内容升级到当前版本，版本号无效时抛出 ConfigInvalid"""
+    version = raw.get("schema_version", 0)
+    if isinstance(version, bool) or not isinstance(version, int):
+        raise ConfigInvalid(f"版本号无效: {version!r}")
+    if version > SCHEMA_VERSION:
+        print(f"配置文件版本 {version} 比程序支持的 {SCHEMA_VERSION} 新，按当前版本读取")
+        return raw
+    while version < SCHEMA_VERSION:
+        if version not in MIGRATIONS:
+            raise ConfigInvalid(f"版本号无效: {version!r}")
+        raw = MIGRATIONS[version](raw)
+        version = raw["schema_version"]
+    return raw
+
+
+class ConfigDocument:
+    """配置文件：结构版本、当前方案名和所有方案"""
+
+    __slots__ = ("active_profile", "profiles")
+
+    def __init__(self, profiles=None, active_profile=DEFAULT_PROFILE):
+        self.profiles = profiles or {}
+        if active_profile not in self.profiles:
+            self.profiles[active_profile] = LimiterConfig()
+        self.active_profile = active_profile
+
+    @classmethod
+    def from_dict(cls, raw, strict=False):
+        """校验并载入，raw 为 None 时使用全部默认值
+
+        整体结构无效时 strict 为真则抛出 ConfigInvalid，否则打印警告并使用默认值；
+        单个配置项无效只丢弃该项，不影响其余内容。
+        """
+        if raw is None:
+            return cls()
+        try:
+            return cls._parse(raw)
+        except ConfigInvalid as e:
+            if strict:
+                raise
+            print(f"配置文件结构无效，使用默认配置: {e}")
+            return cls()
+
+    @classmethod
+    def _parse(cls, raw):
+        if not isinstance(raw, dict):
+            raise ConfigInvalid(f"应为字典: {type(raw).__name__}")
+        raw = migrate(raw)
+        profiles = raw.get("profiles")
+        if profiles is None:
+            profiles = {}
+        if not isinstance(profiles, dict):
+            raise ConfigInvalid(f"profiles 应为字典: {type(profiles).__name__}")
+        profiles = {
+            str(name): LimiterConfig(values if isinstance(values, dict) else None)
+            for name, values in profiles.items()
+        }
+        return cls(profiles, str(raw.get("active_profile", DEFAULT_PROFILE)))
+
+    @property
+    def current(self):
+        return self.profiles[self.active_profile]
+
+    def to_dict(self):
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "active_profile": self.active_profile,
+            "profiles": {name: config.to_dict() for name, config in self.profiles.items()},
+        }
\ No newline at end of file
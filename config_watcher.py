@@ -0,0 +1,191 @@
+"""
+配置文件监视模块
+管理工具直接替换设备上的 limiter_config.json 时，运行中的应用自动重新读取。
+Linux/Android 上用 inotify 阻塞等待目录事件，其他平台按设定间隔比较修改时间；
+编辑器和同步工具连续多次写入时，等文件安静 settle 秒后只通知一次
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# wd, mask, cookie, len，后面跟 len 字节的文件名
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    for name in (ctypes.util.find_library('c'), 'libc.so.6', 'libc.so'):
+        if not name:
+            continue
+        try:
+            libc = ctypes.CDLL(name, use_errno=True)
+            libc.inotify_init1
+            return libc
+        except (OSError, AttributeError):
+            continue
+    return None
+
+
+class _Inotify:
+    """只监视一个目录的 inotify 句柄"""
+
+    def __init__(self, directory):
+        self.libc = _load_libc()
+        if self.libc is None:
+            raise OSError("inotify 不可用")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch 失败")
+
+    def read_names(self):
+        """读出当前所有事件，返回涉及的文件名"""
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """在后台线程中监视配置文件
+
+    on_change() 在文件变化并安静下来后调用一次；
+    dispatch 用于把回调转到主线程，例如 Kivy 的 Clock.schedule_once。
+    """
+
+    def __init__(self, path, on_change, poll_interval=2.0, settle=0.3, dispatch=None,
+                 use_inotify=True):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.dispatch = dispatch or (lambda callback: callback())
+        self.use_inotify = use_inotify
+        self.mode = None
+        self.events = 0
+        self.changes = 0
+        self._stop = threading.Event()
+        self._wake_r = self._wake_w = None
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return self
+        self._stop.clear()
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = _Inotify(os.path.dirname(self.path))
+            except OSError as e:
+                print(f"inotify 不可用，改为每 {self.poll_interval} 秒检查一次: {e}")
+        if inotify:
+            self.mode = "inotify"
+            self._wake_r, self._wake_w = os.pipe()
+            target = lambda: self._run_inotify(inotify)
+        else:
+            self.mode = "poll"
+            target = self._run_poll
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        if self._wake_w is not None:
+            os.write(self._wake_w, b'x')
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        if self._wake_w is not None:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = None
+
+    def _fire(self):
+        self.changes += 1
+        self.dispatch(self.on_change)
+
+    # inotify
+
+    def _run_inotify(self, inotify):
+        try:
+            # 阻塞到第一个相关事件，再等文件安静下来
+            while self._wait_inotify(inotify, None):
+                while self._wait_inotify(inotify, self.settle):
+                    pass
+                if self._stop.is_set():
+                    break
+                self._fire()
+        finally:
+            inotify.close()
+
+    def _wait_inotify(self, inotify, timeout):
+        """等待与配置文件相关的事件，超时或停止时返回False"""
+        name = os.path.basename(self.path)
+        while not self._stop.is_set():
+            readable, _, _ = select.select([inotify.fd, self._wake_r], [], [], timeout)
+            if not readable or self._wake_r in readable:
+                return False
+            names = inotify.read_names()
+            self.events += len(names)
+            if name in names:
+                return True
+            # 只是同目录下其他文件的事件，继续等待
+        return False
+
+    # 轮询
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _run_poll(self):
+        last = self._signature()
+        while not self._stop.wait(self.poll_interval):
+            current = self._signature()
+            if current == last:
+                continue
+            self.events += 1
+            # 连续写入期间一直等待，直到文件在 settle 秒内不再变化
+            while not self._stop.wait(self.settle):
+                newer = self._signature()
+                if newer == current:
+                    break
+                current = newer
+            if self._stop.is_set():
+                break
+            last = current
+            self._fire()
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+字体发现与索引模块
+扫描一次系统字体目录，读取每个字体的 cmap 表检查界面中文字符的覆盖率，
+结果按目录修改时间缓存到磁盘，之后的启动只需读取一个小的缓存文件
+"""
+
+import bisect
+import json
+import os
+import struct
+import sys
+
+INDEX_VERSION = 1
+DEFAULT_CACHE = "limiter_font_index.json"
+# 构建时按界面文字裁剪的字体，随APK打包
+BUNDLED_FONT_DIR = "fonts"
+BUNDLED_FONT_PREFIX = "ui_subset-"
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+
+# 界面上常用的中文字符，用于检查字体覆盖率
+UI_SAMPLE = (
+    "手机使用时间限制器剩余开始限时运行中暂停重置设置返回保存"
+    "通话功能应用启动访问受限请输入管理密码确认取消分钟警告"
+    "额度已用完时段允许成功解锁检测到系统跳变忽略额外紧急联系"
+)
+
+# 覆盖率达到该比例才认为字体可以显示中文界面
+MIN_COVERAGE = 0.98
+
+
+def font_dirs():
+    """当前平台的系统字体目录"""
+    home = os.path.expanduser("~")
+    if sys.platform == 'win32':
+        windir = os.environ.get("WINDIR", "C:/Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == 'darwin':
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    if "ANDROID_ROOT" in os.environ:
+        return ["/system/fonts"]
+    return [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts"),
+    ]
+
+
+def read_cmap_ranges(path):
+    """读取字体第一个字形集的 cmap，返回排序后的 [(起始码位, 结束码位), ...]
+
+    支持 TrueType/OpenType 和字体集合（.ttc 只读取第一个字体，与 Kivy 的加载方式一致）。
+    格式4的段按整段计入，不检查段内映射到空字形的个别码位。
+    """
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if header[:4] == b'ttcf':
+            f.seek(12)
+            offset = struct.unpack('>I', f.read(4))[0]
+            f.seek(offset)
+            header = f.read(12)
+        num_tables = struct.unpack('>H', header[4:6])[0]
+        records = f.read(16 * num_tables)
+
+        cmap = None
+        for index in range(num_tables):
+            tag, _, table_offset, length = struct.unpack_from('>4sIII', records, 16 * index)
+            if tag == b'cmap':
+                f.seek(table_offset)
+                cmap = f.read(length)
+                break
+    if cmap is None:
+        return []
+
+    # 优先使用完整 Unicode 的格式12子表，其次是 BMP 的格式4子表
+    best = None
+    count = struct.unpack_from('>H', cmap, 2)[0]
+    for index in range(count):
+        platform, encoding, offset = struct.unpack_from('>HHI', cmap, 4 + 8 * index)
+        subtable_format = struct.unpack_from('>H', cmap, offset)[0]
+        if platform not in (0, 3) or (platform == 3 and encoding not in (1, 10)):
+            continue
+        if subtable_format == 12:
+            best = (12, offset)
+            break
+        if subtable_format == 4 and best is None:
+            best = (4, offset)
+    if best is None:
+        return []
+
+    subtable_format, offset = best
+    ranges = []
+    if subtable_format == 12:
+        groups = struct.unpack_from('>I', cmap, offset + 12)[0]
+        for index in range(groups):
+            start, end, _ = struct.unpack_from('>III', cmap, offset + 16 + 12 * index)
+            ranges.append((start, end))
+    else:
+        seg_count = struct.unpack_from('>H', cmap, offset + 6)[0] // 2
+        ends = struct.unpack_from(f'>{seg_count}H', cmap, offset + 14)
+        starts = struct.unpack_from(f'>{seg_count}H', cmap, offset + 16 + 2 * seg_count)
+        for start, end in zip(starts, ends):
+            if start != 0xFFFF:
+                ranges.append((start, end))
+    ranges.sort()
+    return ranges
+
+
+def coverage(ranges, text):
+    """text 中不重复的字符被 ranges 覆盖的比例"""
+    codepoints = {ord(char) for char in text}
+    if not codepoints:
+        return 1.0
+    starts = [start for start, _ in ranges]
+    covered = 0
+    for codepoint in codepoints:
+        position = bisect.bisect_right(starts, codepoint) - 1
+        if position >= 0 and ranges[position][1] >= codepoint:
+            covered += 1
+    return covered / len(codepoints)
+
+
+class FontIndex:
+    """系统字体的覆盖率索引
+
+    缓存中记录扫描过的每个目录的修改时间；目录没有变化时直接使用缓存结果。
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE, dirs=None, sample=UI_SAMPLE):
+        self.cache_path = cache_path
+        self.dirs = dirs if dirs is not None else font_dirs()
+        self.sample = sample
+        self.dir_mtimes = {}
+        self.fonts = []
+
+    def load(self):
+        """读取缓存，缓存有效时返回True"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("sample") != self.sample:
+            return False
+        if data.get("roots") != self.dirs:
+            return False
+        for directory, mtime in data.get("dirs", {}).items():
+            if mtime is None:
+                # 扫描时不存在的目录，之后被创建则需要重新扫描
+                if os.path.isdir(directory):
+                    return False
+                continue
+            try:
+                if os.stat(directory).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+        self.dir_mtimes = data["dirs"]
+        self.fonts = data["fonts"]
+        return True
+
+    def scan(self):
+        """扫描字体目录并计算每个字体的覆盖率"""
+        self.dir_mtimes = {}
+        self.fonts = []
+        for root in self.dirs:
+            if not os.path.isdir(root):
+                self.dir_mtimes[root] = None
+                continue
+            for directory, _, files in os.walk(root):
+                try:
+                    self.dir_mtimes[directory] = os.stat(directory).st_mtime
+                except OSError:
+                    continue
+                for name in files:
+                    if not name.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(directory, name)
+                    try:
+                        ratio = coverage(read_cmap_ranges(path), self.sample)
+                        size = os.path.getsize(path)
+                    except (OSError, struct.error) as e:
+                        print(f"读取字体失败 {path}: {e}")
+                        continue
+                    self.fonts.append({"path": path, "coverage": ratio, "size": size})
+
+    def save(self):
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "sample": self.sample,
+                    "roots": self.dirs,
+                    "dirs": self.dir_mtimes,
+                    "fonts": self.fonts,
+                }, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"保存字体索引失败: {e}")
+
+    def refresh(self):
+        """缓存有效时直接使用，否则重新扫描并保存"""
+        if not self.load():
+            self.scan()
+            self.save()
+
+    def best(self, min_coverage=MIN_COVERAGE):
+        """覆盖率最高的字体路径，覆盖率相同时选较小的文件；没有合格字体时返回None"""
+        candidates = [font for font in self.fonts if font["coverage"] >= min_coverage]
+        if not candidates:
+            return None
+        candidates.sort(key=lambda font: (-font["coverage"], font["size"]))
+        return candidates[0]["path"]
+
+
+def bundled_font_file(module_name):
+    """为某个主程序裁剪的字体的相对路径，文件名带主程序名"""
+    return os.path.join(BUNDLED_FONT_DIR, f"{BUNDLED_FONT_PREFIX}{module_name}.ttf")
+
+
+def bundled_font(module_file):
+    """为正在运行的主程序裁剪的字体路径，没有时返回None
+
+    裁剪字体只包含生成它的主程序用到的字符，其他程序使用会缺字，
+    因此按主程序名查找，不匹配时由调用方改用系统字体。
+    """
+    name = os.path.splitext(os.path.basename(module_file))[0]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), bundled_font_file(name))
+    return path if os.path.exists(path) else None
+
+
+def find_cjk_font(cache_path=DEFAULT_CACHE, dirs=None, sample=UI_SAMPLE):
+    """返回能显示界面中文的系统字体路径，找不到时返回None"""
+    index = FontIndex(cache_path, dirs, sample)
+    index.refresh()
+    return index.best()
+
+
+def ui_font(module_file, dynamic_text=False):
+    """主程序界面使用的字体路径，找不到时返回None
+
+    裁剪字体只含源码里出现的字符；dynamic_text 为真（如显示设备上已安装应用的名称）时
+    优先使用系统的完整中文字体，没有时才退回裁剪字体。
+    """
+    subset = bundled_font(module_file)
+    if subset and not dynamic_text:
+        return subset
+    return find_cjk_font() or subset
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+构建时字体裁剪模块
+从主程序及其导入的本地模块的源码中提取界面用到的全部字符串，
+把中文字体裁剪为只包含这些字符的子集，打包进APK后在运行时注册为 'Chinese'，
+避免携带完整的中文字体
+
+裁剪需要 fontTools (pip install fonttools)，只在构建机上使用
+"""
+
+import ast
+import os
+
+try:
+    from fontTools import subset
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    FONTTOOLS_AVAILABLE = False
+
+from font_index import BUNDLED_FONT_DIR, BUNDLED_FONT_PREFIX, bundled_font_file, find_cjk_font
+
+# 始终保留的字符：ASCII可见字符（数字、英文应用名）和进度条符号
+BASE_TEXT = "".join(chr(code) for code in range(0x20, 0x7F)) + "█░←"
+
+
+def _imported_names(node):
+    if isinstance(node, ast.Import):
+        return [alias.name for alias in node.names]
+    if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+        return [node.module]
+    return []
+
+
+def extract_ui_text(main_module):
+    """提取主程序及其导入的同目录模块中所有字符串字面量（含 f-string 的固定部分）用到的字符
+
+    弹窗池等模块里的按钮文字不在主程序中，函数内的延迟导入也一并扫描。
+    返回 (字符, 扫描的模块路径列表)。
+    """
+    directory = os.path.dirname(os.path.abspath(main_module))
+    pending = [os.path.abspath(main_module)]
+    modules = []
+    chars = set(BASE_TEXT)
+    while pending:
+        path = pending.pop()
+        if path in modules:
+            continue
+        modules.append(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, UnicodeDecodeError) as e:
+            print(f"警告: 无法解析 {os.path.basename(path)}，跳过: {e}")
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                chars.update(node.value)
+            for name in _imported_names(node):
+                candidate = os.path.join(directory, name.split('.')[0] + ".py")
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+    # 换行、制表符等控制字符不需要字形
+    return "".join(sorted(char for char in chars if char.isprintable())), modules
+
+
+def subset_font(source, output, text, font_number=0):
+    """把 source 裁剪为只包含 text 中字符的字体，成功时返回True"""
+    if not FONTTOOLS_AVAILABLE:
+        print("警告: 未安装fontTools，跳过字体裁剪 (pip install fonttools)")
+        return False
+    try:
+        options = subset.Options()
+        options.font_number = font_number
+        options.notdef_outline = True
+        options.name_IDs = ['*']
+        font = subset.load_font(source, options, dontLoadGlyphNames=True)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        subset.save_font(font, output, options)
+        font.close()
+        return True
+    except Exception as e:
+        print(f"字体裁剪失败: {e}")
+        return False
+
+
+def build_subset_font(main_module, project_dir=".", source=None):
+    """为主程序生成裁剪后的字体，返回输出路径，失败时返回None
+
+    source 为空时从构建机的系统字体中选择覆盖率最高的中文字体。
+    """
+    source = source or find_cjk_font()
+    if source is None:
+        print("警告: 构建机上未找到中文字体，跳过字体裁剪")
+        return None
+
+    text, modules = extract_ui_text(main_module)
+    name = os.path.splitext(os.path.basename(main_module))[0]
+    output = os.path.join(project_dir, bundled_font_file(name))
+    if not subset_font(source, output, text):
+        return None
+
+    # 删除为其他主程序或旧版本生成的裁剪字体，避免一起打包
+    font_dir = os.path.join(project_dir, BUNDLED_FONT_DIR)
+    for old in os.listdir(font_dir):
+        old_path = os.path.join(font_dir, old)
+        if old.startswith(BUNDLED_FONT_PREFIX[:-1]) and old_path != output:
+            os.remove(old_path)
+
+    original = os.path.getsize(source)
+    reduced = os.path.getsize(output)
+    print(f"✓ 裁剪字体 {os.path.basename(source)}: {len(modules)} 个模块，{len(text)} 个字符，"
+          f"{original / 1024 / 1024:.2f} MB -> {reduced / 1024:.1f} KB")
+    return output
\ No newline at end of file
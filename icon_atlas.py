@@ -0,0 +1,113 @@
+"""
+图标图集构建模块
+把 icons/ 目录下的应用图标（144px 源图，文件名即 PhoneApp.icon）按各屏幕密度缩放后打包成 Kivy 图集，
+运行时所有图标来自同一张纹理，不再逐个解码和上传图片
+
+构建需要 Pillow (pip install pillow)，只在构建机上使用
+"""
+
+import json
+import math
+import os
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+ICON_DIR = "icons"
+ATLAS_DIR = "atlas"
+ATLAS_PREFIX = "icons"
+# mdpi / hdpi / xhdpi / xxhdpi 下 48dp 图标的像素尺寸
+DENSITY_SIZES = (48, 72, 96, 144)
+# 图标之间留空，避免纹理过滤时相邻图标互相渗色
+PADDING = 2
+
+
+def atlas_file(size, project_dir=None):
+    """某个尺寸的 .atlas 文件路径"""
+    base = project_dir or os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, ATLAS_DIR, f"{ATLAS_PREFIX}-{size}.atlas")
+
+
+def pick_size(pixels):
+    """不小于所需像素的最小图集尺寸，超过最大尺寸时返回最大尺寸"""
+    for size in DENSITY_SIZES:
+        if size >= pixels:
+            return size
+    return DENSITY_SIZES[-1]
+
+
+def icon_key(icon):
+    """图集中的图标名，"phone.png" -> "phone" """
+    return os.path.splitext(os.path.basename(icon))[0]
+
+
+def collect_icons(project_dir="."):
+    """返回 {图标名: 文件路径}"""
+    icon_dir = os.path.join(project_dir, ICON_DIR)
+    if not os.path.isdir(icon_dir):
+        return {}
+    return {
+        icon_key(name): os.path.join(icon_dir, name)
+        for name in sorted(os.listdir(icon_dir))
+        if name.lower().endswith('.png')
+    }
+
+
+def _power_of_two(value):
+    return 1 << max(0, math.ceil(math.log2(value)))
+
+
+def build_atlas(icons, size, output_dir):
+    """把所有图标缩放到 size 像素并排成网格，写出 .atlas 和对应的 png"""
+    names = sorted(icons)
+    cols = math.ceil(math.sqrt(len(names)))
+    rows = math.ceil(len(names) / cols)
+    cell = size + 2 * PADDING
+    width = _power_of_two(cols * cell)
+    height = _power_of_two(rows * cell)
+
+    sheet = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    regions = {}
+    for index, name in enumerate(names):
+        x = (index % cols) * cell + PADDING
+        top = (index // cols) * cell + PADDING
+        with Image.open(icons[name]) as icon:
+            sheet.paste(icon.convert('RGBA').resize((size, size), Image.LANCZOS), (x, top))
+        # Kivy 图集的坐标以左下角为原点
+        regions[name] = [x, height - top - size, size, size]
+
+    os.makedirs(output_dir, exist_ok=True)
+    image_name = f"{ATLAS_PREFIX}-{size}-0.png"
+    sheet.save(os.path.join(output_dir, image_name))
+    path = os.path.join(output_dir, f"{ATLAS_PREFIX}-{size}.atlas")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({image_name: regions}, f, ensure_ascii=False)
+    return path
+
+
+def build_icon_atlases(project_dir="."):
+    """为每个屏幕密度生成图集，返回生成的 .atlas 路径列表"""
+    icons = collect_icons(project_dir)
+    if not icons:
+        print(f"提示: {ICON_DIR}/ 下没有图标，跳过图集构建")
+        return []
+    if not PIL_AVAILABLE:
+        print("警告: 未安装Pillow，跳过图集构建 (pip install pillow)")
+        return []
+
+    output_dir = os.path.join(project_dir, ATLAS_DIR)
+    paths = []
+    for size in DENSITY_SIZES:
+        try:
+            paths.append(build_atlas(icons, size, output_dir))
+        except Exception as e:
+            print(f"构建 {size}px 图集失败: {e}")
+    print(f"✓ 打包 {len(icons)} 个图标到 {len(paths)} 个图集")
+    return paths
+
+
+if __name__ == '__main__':
+    build_icon_atlases()
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+已安装应用图标缓存模块
+图标在后台线程中读取和解码，内存中按字节数限制的LRU缓存纹理，
+磁盘上按包名和版本号缓存PNG，再次启动时不需要访问PackageManager
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+from kivy.clock import Clock
+from kivy.core.image import ImageLoader
+
+DEFAULT_CACHE_DIR = "icon_cache"
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+class IconCache:
+    """图标服务
+
+    loader(package) -> PNG字节 或 None，只在磁盘缓存未命中时在后台线程中调用。
+    request() 的回调总是在主线程中执行，参数为纹理（加载失败时为None）。
+    loader 返回 None 的包记为没有图标，之后不再访问 PackageManager。
+    """
+
+    def __init__(self, loader, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.loader = loader
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.textures = OrderedDict()
+        self.total_bytes = 0
+        # 没有图标的 (包名, 版本号)
+        self.missing = set()
+        self.pending = {}
+        self.queue = queue.Queue()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.loader_calls = 0
+        self.worker = None
+
+    def request(self, package, version_code, callback):
+        """请求图标，已在内存中时立即回调"""
+        key = (package, version_code)
+        entry = self.textures.get(key)
+        if entry is not None:
+            self.textures.move_to_end(key)
+            self.memory_hits += 1
+            callback(entry[0])
+            return
+        if key in self.missing:
+            self.memory_hits += 1
+            callback(None)
+            return
+        if key in self.pending:
+            self.pending[key].append(callback)
+            return
+        self.pending[key] = [callback]
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, daemon=True)
+            self.worker.start()
+        self.queue.put(key)
+
+    def disk_path(self, package, version_code):
+        return os.path.join(self.cache_dir, f"{package}-{version_code}.png")
+
+    def _run(self):
+        while True:
+            key = self.queue.get()
+            image = None
+            missing = False
+            try:
+                path = self._ensure_png(*key)
+                if path:
+                    # 在后台线程解码像素，纹理在主线程上传
+                    image = ImageLoader.load(path)
+                else:
+                    missing = True
+            except Exception as e:
+                print(f"加载图标失败 {key[0]}: {e}")
+            Clock.schedule_once(
+                lambda dt, key=key, image=image, missing=missing: self._finish(key, image, missing))
+
+    def _ensure_png(self, package, version_code):
+        """返回磁盘缓存中的PNG路径，没有时通过 loader 取得并写入"""
+        path = self.disk_path(package, version_code)
+        if os.path.exists(path):
+            self.disk_hits += 1
+            return path
+
+        self.loader_calls += 1
+        data = self.loader(package)
+        if not data:
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        # 删除同一应用旧版本的图标
+        prefix = f"{package}-"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name != os.path.basename(path):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        return path
+
+    def _finish(self, key, image, missing=False):
+        texture = None
+        if missing:
+            self.missing.add(key)
+        if image is not None:
+            texture = image.texture
+            self._store(key, texture, image.width * image.height * 4)
+        for callback in self.pending.pop(key, []):
+            callback(texture)
+
+    def _store(self, key, texture, size):
+        self.textures[key] = (texture, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.textures) > 1:
+            _, (_, evicted) = self.textures.popitem(last=False)
+            self.total_bytes -= evicted
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+空闲帧率调节模块
+一段时间没有触摸或按键、或窗口进入后台时降低 Kivy 主循环的帧率，
+收到输入立即恢复，并统计各模式下每分钟的主循环唤醒次数
+"""
+
+import time
+
+MODE_ACTIVE = "active"
+MODE_IDLE = "idle"
+MODE_BACKGROUND = "background"
+
+MODE_NAMES = {
+    MODE_ACTIVE: "活跃",
+    MODE_IDLE: "空闲",
+    MODE_BACKGROUND: "后台",
+}
+
+
+class IdleGovernor:
+    """根据用户输入切换活跃/空闲/后台模式
+
+    on_idle / on_active / on_background 用于暂停和恢复非必要的定时回调。
+    """
+
+    def __init__(self, window, clock, idle_after=10, idle_fps=2, background_fps=1,
+                 on_idle=None, on_active=None, on_background=None, now=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self.idle_after = idle_after
+        self.now = now
+        # Kivy 没有公开运行时修改帧率的接口，直接调整时钟的 _max_fps
+        self.fps = {
+            MODE_ACTIVE: clock._max_fps,
+            MODE_IDLE: idle_fps,
+            MODE_BACKGROUND: background_fps,
+        }
+        self.hooks = {
+            MODE_ACTIVE: on_active,
+            MODE_IDLE: on_idle,
+            MODE_BACKGROUND: on_background,
+        }
+        self.mode = MODE_ACTIVE
+        self.last_input = now()
+        self.stats = {mode: [0, 0.0] for mode in MODE_NAMES}
+        self._mode_started = self.last_input
+        self._mode_frames = clock.frames
+        self._idle_event = None
+
+        window.bind(on_motion=self._on_input, on_key_down=self._on_input)
+        window.bind(on_hide=lambda *args: self.set_background(True),
+                    on_show=lambda *args: self.set_background(False))
+        self._arm_idle_check(idle_after)
+
+    def _on_input(self, *args):
+        self.last_input = self.now()
+        if self.mode == MODE_IDLE:
+            self.set_mode(MODE_ACTIVE)
+        # 不拦截事件
+        return False
+
+    def _arm_idle_check(self, delay):
+        if self._idle_event:
+            self._idle_event.cancel()
+        self._idle_event = self.clock.schedule_once(self._check_idle, delay)
+
+    def _check_idle(self, dt):
+        self._idle_event = None
+        if self.mode != MODE_ACTIVE:
+            return
+        quiet = self.now() - self.last_input
+        if quiet >= self.idle_after:
+            self.set_mode(MODE_IDLE)
+        else:
+            # 只在最后一次输入满 idle_after 秒时检查，输入期间不额外唤醒
+            self._arm_idle_check(self.idle_after - quiet)
+
+    def set_background(self, background):
+        """窗口进入或离开后台"""
+        if background:
+            self.set_mode(MODE_BACKGROUND)
+        elif self.mode == MODE_BACKGROUND:
+            self.last_input = self.now()
+            self.set_mode(MODE_ACTIVE)
+
+    def set_mode(self, mode):
+        if mode == self.mode:
+            return
+        self._close_period()
+        self.mode = mode
+        self.clock._max_fps = self.fps[mode]
+        if mode == MODE_ACTIVE:
+            self._arm_idle_check(self.idle_after)
+        hook = self.hooks[mode]
+        if hook:
+            hook()
+
+    def _close_period(self):
+        """把当前模式持续期间的帧数和时长计入统计"""
+        now = self.now()
+        frames = self.clock.frames
+        stats = self.stats[self.mode]
+        stats[0] += frames - self._mode_frames
+        stats[1] += now - self._mode_started
+        self._mode_started = now
+        self._mode_frames = frames
+
+    def wakeups_per_minute(self):
+        """各模式下平均每分钟的主循环唤醒次数，没有数据的模式为None"""
+        self._close_period()
+        return {
+            mode: frames / seconds * 60 if seconds > 0 else None
+            for mode, (frames, seconds) in self.stats.items()
+        }
+
+    def format_summary(self):
+        """调试面板显示的文本"""
+        parts = []
+        for mode, rate in self.wakeups_per_minute().items():
+            value = "无数据" if rate is None else f"{rate:.0f}"
+            parts.append(f"{MODE_NAMES[mode]} {value}")
+        return "每分钟唤醒: " + "  ".join(parts)
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+延迟构建屏幕模块
+屏幕以工厂函数注册，第一次切换到该屏幕时才创建，
+启动时只需构建首屏
+"""
+
+import time
+
+from kivy.uix.screenmanager import ScreenManager
+
+
+class LazyScreenManager(ScreenManager):
+    """支持按需构建屏幕的屏幕管理器"""
+
+    def __init__(self, **kwargs):
+        super(LazyScreenManager, self).__init__(**kwargs)
+        self.factories = {}
+        self.build_times = {}
+
+    def register(self, name, factory):
+        """注册屏幕工厂，factory() 返回名称为 name 的 Screen"""
+        self.factories[name] = factory
+
+    def on_current(self, instance, value):
+        if value in self.factories and value not in self.screen_names:
+            self.build_screen(value)
+        super(LazyScreenManager, self).on_current(instance, value)
+
+    def build_screen(self, name):
+        """立即构建一个已注册的屏幕"""
+        start = time.perf_counter()
+        screen = self.factories.pop(name)()
+        self.add_widget(screen)
+        self.build_times[name] = time.perf_counter() - start
+        print(f"构建界面 {name} 耗时 {self.build_times[name] * 1000:.1f}ms")
+        return screen
\ No newline at end of file
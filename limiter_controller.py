@@ -0,0 +1,213 @@
+"""
+限时控制模块
+开始/暂停/重置/解锁、到时锁定、午夜清空配额、时段切换和打开应用的放行判断，
+不依赖Kivy；MainScreen 和快进模拟器共用这一份逻辑，界面只负责显示和弹窗
+"""
+
+import time
+
+from timer_engine import TimerEngine
+from quota_engine import QuotaEngine
+from weekly_schedule import WeeklySchedule
+from usage_ledger import EVENT_OPEN_APP
+
+# 应用格子的显示状态
+TILE_CALL = "call"
+TILE_HIDDEN = "hidden"
+TILE_BLOCKED = "blocked"
+TILE_NORMAL = "normal"
+
+# 打开应用的判断结果
+OPEN_ALLOWED = "allowed"
+DENIED_TIME_UP = "time_up"
+DENIED_SCHEDULE = "schedule"
+DENIED_QUOTA = "quota"
+
+
+class LimiterController:
+    """无界面的限时逻辑
+
+    config 为 LimiterConfig；clock 和 scheduler 可以是同一个 VirtualClock。
+    界面通过回调得到通知：on_warning()、on_expired()、on_quota_exhausted(key)，
+    应用的可用状态变化时调用 on_state_changed()。
+    """
+
+    def __init__(self, config, clock, scheduler, on_warning=None, on_expired=None,
+                 on_quota_exhausted=None, on_state_changed=None, on_tick=None,
+                 tick_interval=0, journal=None, ledger=None, quota_state_path=None):
+        self.clock = clock
+        self.scheduler = scheduler
+        self.ledger = ledger
+        self.on_warning = on_warning
+        self.on_expired = on_expired
+        self.on_quota_exhausted = on_quota_exhausted
+        self.on_state_changed = on_state_changed
+        self.time_limit = config.time_limit_minutes * 60
+        self.time_up = False
+
+        # 计时引擎只在警告和到时两个截止时间唤醒
+        self.engine = TimerEngine(
+            self.time_limit,
+            config.warning_minutes * 60,
+            on_warning=self._on_warning,
+            on_expire=self._on_expired,
+            on_tick=on_tick,
+            tick_interval=tick_interval,
+            scheduler=scheduler,
+            journal=journal,
+            clock=clock,
+            ledger=ledger
+        )
+
+        # 分类/应用每日配额（分钟），到时由调度器回调，不逐个扫描应用
+        self.quota = QuotaEngine(
+            config.category_limits,
+            config.app_limits,
+            on_exhausted=self._on_quota_exhausted,
+            clock=clock.monotonic_ns,
+            scheduler=scheduler,
+            state_path=quota_state_path,
+            wall_clock=clock.time
+        )
+        self.schedule_daily_reset()
+
+        # 每周时段规则，只在允许/禁止状态切换时唤醒
+        self.schedule = WeeklySchedule(config.schedule_rules, config.schedule_overrides)
+        self.schedule_blocked = not self.schedule.is_allowed(clock.time())
+        self.schedule_event = None
+        self.arm_schedule_transition()
+
+    def restore(self):
+        """从会话日志恢复计时状态，返回上次退出时是否仍在计时"""
+        was_running = self.engine.restore()
+        if self.engine.expired:
+            self.time_up = True
+            self._changed()
+        return was_running
+
+    def configure(self, config, changed):
+        """设置变化后只重新计算受影响的部分"""
+        if changed & {"time_limit_minutes", "warning_minutes"}:
+            self.time_limit = config.time_limit_minutes * 60
+            self.engine.configure(self.time_limit, config.warning_minutes * 60)
+        if changed & {"category_limits", "app_limits"}:
+            self.quota.configure(config.category_limits, config.app_limits)
+            self._changed()
+        if changed & {"schedule_rules", "schedule_overrides"}:
+            self.schedule = WeeklySchedule(config.schedule_rules, config.schedule_overrides)
+            self.schedule_blocked = not self.schedule.is_allowed(self.clock.time())
+            self.arm_schedule_transition()
+            self._changed()
+
+    # 计时
+
+    def start(self):
+        """开始或继续计时，已到时不能开始；返回是否已开始"""
+        if self.engine.running or self.time_up:
+            return False
+        self.engine.start()
+        return True
+
+    def pause(self):
+        """暂停计时"""
+        self.engine.pause()
+
+    def reset(self, unlock=False):
+        """重置计时；unlock 为真表示密码解锁，同时清空当天配额"""
+        self.time_up = False
+        if unlock:
+            self.engine.unlock(self.time_limit)
+            self.quota.reset()
+        else:
+            self.engine.reset(self.time_limit)
+        self._changed()
+
+    def _on_warning(self):
+        if self.on_warning:
+            self.on_warning()
+
+    def _on_expired(self):
+        """使用时间用完，只保留通话相关应用；前台应用由界面决定如何处理"""
+        self.time_up = True
+        if self.on_expired:
+            self.on_expired()
+        self._changed()
+
+    # 应用
+
+    def tile_state(self, app):
+        """应用格子的显示状态"""
+        if app.is_call_related:
+            return TILE_CALL
+        # 时间到后只显示通话相关应用
+        if self.time_up:
+            return TILE_HIDDEN
+        if self.schedule_blocked or self.quota.is_blocked(app):
+            return TILE_BLOCKED
+        return TILE_NORMAL
+
+    def check_open(self, app):
+        """能否打开应用，返回 OPEN_ALLOWED 或拒绝原因"""
+        if not app.is_call_related:
+            if self.time_up:
+                return DENIED_TIME_UP
+            if self.schedule_blocked:
+                return DENIED_SCHEDULE
+        if self.quota.is_blocked(app):
+            return DENIED_QUOTA
+        return OPEN_ALLOWED
+
+    def open_app(self, app):
+        """打开应用，允许时记入使用记录并切换前台配额；返回 check_open 的结果"""
+        result = self.check_open(app)
+        if result == OPEN_ALLOWED:
+            if self.ledger:
+                self.ledger.append(EVENT_OPEN_APP, self.engine.elapsed(), app.name)
+            self.quota.set_foreground(app)
+        return result
+
+    def close_app(self):
+        """前台应用关闭，回到启动器"""
+        self.quota.set_foreground(None)
+
+    def _on_quota_exhausted(self, key):
+        self._changed()
+        if self.on_quota_exhausted:
+            self.on_quota_exhausted(key)
+
+    # 每日清零和时段切换
+
+    def schedule_daily_reset(self):
+        """在本地时间午夜清空每日配额"""
+        now = time.localtime(self.clock.time())
+        seconds_today = now.tm_hour * 3600 + now.tm_min * 60 + now.tm_sec
+        self.scheduler.schedule_once(self.on_new_day, 24 * 3600 - seconds_today)
+
+    def on_new_day(self, dt):
+        """新的一天"""
+        self.clock.check_wall_jump()
+        self.quota.reset()
+        self._changed()
+        self.schedule_daily_reset()
+
+    def arm_schedule_transition(self):
+        """预约下一次时段切换"""
+        if self.schedule_event:
+            self.schedule_event.cancel()
+            self.schedule_event = None
+        delay = self.schedule.seconds_until_transition(self.clock.time())
+        if delay is not None:
+            # 多等1秒，确保醒来时已经处于新的分钟
+            self.schedule_event = self.scheduler.schedule_once(self.on_schedule_transition, delay + 1)
+
+    def on_schedule_transition(self, dt):
+        """允许/禁止时段切换"""
+        self.schedule_event = None
+        self.clock.check_wall_jump()
+        self.schedule_blocked = not self.schedule.is_allowed(self.clock.time())
+        self._changed()
+        self.arm_schedule_transition()
+
+    def _changed(self):
+        if self.on_state_changed:
+            self.on_state_changed()
\ No newline at end of file
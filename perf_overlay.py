@@ -0,0 +1,141 @@
+"""
+性能浮层模块（调试用，默认关闭）
+在窗口左上角显示滚动FPS、帧耗时百分位、控件总数、打开的弹窗数和 Clock 事件数，
+并每秒写入一行CSV，便于在真机上发现控件泄漏
+"""
+
+import csv
+import os
+import time
+
+from kivy.uix.label import Label
+from kivy.uix.modalview import ModalView
+
+from tick_stats import RingBuffer
+
+ENV_FLAG = "LIMITER_PERF_OVERLAY"
+DEFAULT_CSV = "limiter_perf.csv"
+CSV_FIELDS = ("time", "fps", "frame_p50_ms", "frame_p95_ms", "frame_p99_ms",
+              "widgets", "popups", "clock_events")
+
+
+def is_enabled(config=None):
+    """是否开启浮层：环境变量或配置项 perf_overlay"""
+    if os.environ.get(ENV_FLAG):
+        return True
+    return bool(config and config.get("perf_overlay"))
+
+
+class PerfOverlay:
+    """性能浮层，start() 后每帧记录帧耗时，每 interval 秒刷新一次显示"""
+
+    def __init__(self, window, clock, root, csv_path=DEFAULT_CSV, interval=1.0, font_name=None):
+        self.window = window
+        self.clock = clock
+        self.root = root
+        self.csv_path = csv_path
+        self.interval = interval
+        self.font_name = font_name
+        self.frame_times = RingBuffer(256)
+        self.label = None
+        self.active = False
+        self._events = []
+        self._csv_file = None
+        self._csv = None
+        self._frames = 0
+        self._last_sample = time.perf_counter()
+
+    def toggle(self):
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self):
+        if self.active:
+            return
+        self.active = True
+        if self.label is None:
+            self.label = Label(
+                size_hint=(None, None),
+                size=(300, 120),
+                font_size='11sp',
+                halign='left',
+                valign='top',
+                color=(1, 0.3, 0.3, 1)
+            )
+            self.label.bind(size=self.label.setter('text_size'))
+            if self.font_name:
+                self.label.font_name = self.font_name
+        self.window.add_widget(self.label)
+        self._place()
+        self.window.bind(size=self._place)
+        self._frames = 0
+        self._last_sample = time.perf_counter()
+        self._events = [
+            self.clock.schedule_interval(self._on_frame, 0),
+            self.clock.schedule_interval(self._sample, self.interval),
+        ]
+        self._open_csv()
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        for event in self._events:
+            event.cancel()
+        self._events = []
+        self.window.unbind(size=self._place)
+        self.window.remove_widget(self.label)
+        if self._csv_file:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
+
+    def _place(self, *args):
+        self.label.pos = (5, self.window.height - self.label.height - 5)
+
+    def _open_csv(self):
+        try:
+            new_file = not os.path.exists(self.csv_path)
+            self._csv_file = open(self.csv_path, 'a', newline='', encoding='utf-8')
+            self._csv = csv.writer(self._csv_file)
+            if new_file:
+                self._csv.writerow(CSV_FIELDS)
+        except OSError as e:
+            print(f"打开性能日志失败: {e}")
+            self._csv_file = None
+            self._csv = None
+
+    def _on_frame(self, dt):
+        self.frame_times.append(dt)
+        self._frames += 1
+
+    def _sample(self, dt):
+        now = time.perf_counter()
+        fps = self._frames / (now - self._last_sample) if now > self._last_sample else 0.0
+        self._frames = 0
+        self._last_sample = now
+
+        p50, p95, p99 = (
+            (self.frame_times.percentile(fraction) or 0.0) * 1000
+            for fraction in (0.50, 0.95, 0.99)
+        )
+        # ScreenManager.walk() 只遍历当前屏幕，已构建的其他屏幕也要算上
+        screens = getattr(self.root, 'screens', None) or [self.root]
+        widgets = sum(1 for screen in screens for _ in screen.walk())
+        # 弹窗打开时挂在窗口上
+        popups = sum(1 for child in self.window.children if isinstance(child, ModalView))
+        clock_events = len(self.clock.get_events())
+
+        self.label.text = (
+            f"FPS: {fps:.1f}\n"
+            f"帧耗时: p50 {p50:.1f}ms  p95 {p95:.1f}ms  p99 {p99:.1f}ms\n"
+            f"控件: {widgets}  弹窗: {popups}  Clock事件: {clock_events}"
+        )
+        if self._csv:
+            self._csv.writerow((
+                f"{time.time():.0f}", f"{fps:.1f}", f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}",
+                widgets, popups, clock_events
+            ))
+            self._csv_file.flush()
\ No newline at end of file
@@ -1,16 +1,15 @@
 import time
 import threading
-from datetime import datetime, timedelta
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.uix.popup import Popup
 from kivy.uix.image import Image
 from kivy.uix.gridlayout import GridLayout
 from kivy.graphics import Color, Rectangle
+from timer_engine import TimerEngine
 
 class PhoneApp:
     """模拟手机应用的类"""
@@ -32,12 +31,14 @@ class PhoneTimeLimiter(BoxLayout):
         
         # 初始化应用状态
         self.time_limit = 30 * 60  # 30分钟，以秒为单位
-        self.time_remaining = self.time_limit
-        self.timer_running = False
-        self.timer_thread = None
-        self.start_time = None
-        self.warning_shown = False
         self.time_up = False
+        self.engine = TimerEngine(
+            self.time_limit,
+            5 * 60,  # 剩余5分钟时警告
+            on_warning=self.on_time_warning,
+            on_expire=self.on_time_expired,
+            on_tick=self.update_ui
+        )
         
         # 创建应用列表
         self.apps = [
@@ -90,9 +91,6 @@ class PhoneTimeLimiter(BoxLayout):
         self.app_grid = GridLayout(cols=3, spacing=10, padding=10, size_hint=(1, 0.7))
         self.update_app_grid()
         self.add_widget(self.app_grid)
-        
-        # 设置定时器更新UI
-        Clock.schedule_interval(self.update_ui, 1)
     
     def _update_rect(self, instance, value):
         """更新背景矩形大小"""
@@ -142,55 +140,47 @@ class PhoneTimeLimiter(BoxLayout):
     
     def start_timer(self, instance):
         """开始计时"""
-        if not self.timer_running:
-            self.timer_running = True
-            self.start_time = datetime.now()
+        if self.time_up:
+            return
+        if not self.engine.running:
+            self.engine.start()
             self.start_button.text = "暂停"
             self.start_button.background_color = (0.8, 0.8, 0.2, 1)  # 黄色
         else:
-            self.timer_running = False
+            self.engine.pause()
             self.start_button.text = "继续"
             self.start_button.background_color = (0.2, 0.7, 0.3, 1)  # 绿色
     
     def reset_timer(self, instance):
         """重置计时器"""
-        self.timer_running = False
-        self.time_remaining = self.time_limit
-        self.warning_shown = False
         self.time_up = False
+        self.engine.reset()
         self.start_button.text = "开始计时"
         self.start_button.background_color = (0.2, 0.7, 0.3, 1)  # 绿色
         self.update_app_grid()
     
-    def update_ui(self, dt):
+    def on_time_warning(self):
+        """剩余5分钟警告"""
+        self.show_popup("时间警告", "还剩5分钟使用时间！")
+    
+    def on_time_expired(self):
+        """使用时间用完"""
+        self.time_up = True
+        self.show_popup("时间到", "使用时间已结束，只能使用通话功能！")
+        self.update_app_grid()
+    
+    def update_ui(self, remaining):
         """更新UI"""
-        if self.timer_running:
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            self.time_remaining = max(0, self.time_limit - elapsed)
-            
-            # 检查是否需要显示警告（25分钟）
-            warning_threshold = 5 * 60  # 5分钟 = 300秒
-            if self.time_remaining <= warning_threshold and not self.warning_shown:
-                self.warning_shown = True
-                self.show_popup("时间警告", "还剩5分钟使用时间！")
-            
-            # 检查时间是否用完
-            if self.time_remaining <= 0 and not self.time_up:
-                self.time_up = True
-                self.timer_running = False
-                self.show_popup("时间到", "使用时间已结束，只能使用通话功能！")
-                self.update_app_grid()
-        
         # 更新时间显示
-        minutes = int(self.time_remaining // 60)
-        seconds = int(self.time_remaining % 60)
+        minutes = int(remaining // 60)
+        seconds = int(remaining % 60)
         self.time_label.text = f"剩余时间: {minutes:02d}:{seconds:02d}"
         
         # 更新状态显示
         if self.time_up:
             self.status_label.text = "使用时间已结束，只能使用通话功能"
             self.status_label.color = (1, 0, 0, 1)  # 红色
-        elif self.timer_running:
+        elif self.engine.running:
             self.status_label.text = "计时中..."
             self.status_label.color = (0, 0.7, 0, 1)  # 绿色
         else:
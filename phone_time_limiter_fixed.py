@@ -1,104 +1,80 @@
 # -*- coding: utf-8 -*-
-import time
 import threading
-import json
-import os
-import sys
-from datetime import datetime, timedelta
+from startup_trace import TRACE
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.uix.textinput import TextInput
-from kivy.uix.slider import Slider
 from kivy.clock import Clock
 from kivy.core.window import Window
-from kivy.uix.popup import Popup
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.screenmanager import ScreenManager, Screen
+from kivy.uix.screenmanager import Screen
 from kivy.graphics import Color, Rectangle
-from kivy.uix.switch import Switch
 from kivy.core.text import LabelBase
+from timer_engine import default_scheduler
+from time_source import TrustedClock, CLOCK_ANCHOR_FILE
+from session_journal import SessionJournal
+from usage_ledger import UsageLedger
+from quota_engine import QUOTA_STATE_FILE
+from limiter_controller import (
+    LimiterController, TILE_CALL, TILE_HIDDEN, TILE_BLOCKED, TILE_NORMAL,
+    DENIED_TIME_UP, DENIED_SCHEDULE, DENIED_QUOTA
+)
+import tick_stats
+from settings_store import SettingsStore
+import perf_overlay
+from config_watcher import ConfigWatcher
+from status_render import StatusRenderer, STATUS_IDLE, STATUS_RUNNING, STATUS_LOCKED
+from popup_pool import PopupManager
+from icon_cache import IconCache
+from app_grid import AppLauncherView, IconAtlas, COLOR_CALL, COLOR_BLOCKED, COLOR_NORMAL
+from lazy_screens import LazyScreenManager
+from idle_governor import IdleGovernor
+from font_index import ui_font
+
+TRACE.mark("导入模块")
 
 # 设置中文字体支持
 def setup_chinese_font():
-    """设置中文字体"""
-    if sys.platform == 'win32':
-        # Windows系统字体路径
-        font_paths = [
-            'C:/Windows/Fonts/msyh.ttc',  # 微软雅黑
-            'C:/Windows/Fonts/simhei.ttf',  # 黑体
-            'C:/Windows/Fonts/simsun.ttc',  # 宋体
-            'C:/Windows/Fonts/simkai.ttf',  # 楷体
-        ]
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    LabelBase.register(name='Chinese', fn_regular=font_path)
-                    print(f"成功加载中文字体: {font_path}")
-                    return True
-                except Exception as e:
-                    print(f"加载字体失败 {font_path}: {e}")
-                    continue
-        
+    """设置中文字体，优先使用打包的裁剪字体，其次从缓存的字体索引中选择
+
+    裁剪字体只含源码里的文字，显示已安装应用时改用系统的完整中文字体。
+    """
+    font_path = ui_font(__file__, dynamic_text=SettingsData.shared().config.show_installed_apps)
+    if font_path is None:
         print("警告: 未找到可用的中文字体")
         return False
-    else:
-        # Linux/macOS 字体路径
-        font_paths = [
-            '/System/Library/Fonts/PingFang.ttc',  # macOS
-            '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux
-        ]
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    LabelBase.register(name='Chinese', fn_regular=font_path)
-                    return True
-                except:
-                    continue
+    try:
+        LabelBase.register(name='Chinese', fn_regular=font_path)
+        print(f"成功加载中文字体: {font_path}")
+        return True
+    except Exception as e:
+        print(f"加载字体失败 {font_path}: {e}")
         return False
 
+class SettingsData(SettingsStore):
+    """设置数据管理类，通过 SettingsData.shared() 共用一个实例
+
+    各配置项及默认值见 config_schema.FIELDS。
+    """
+
 # 初始化字体
 font_available = setup_chinese_font()
+TRACE.mark("注册字体")
 
-class SettingsData:
-    """设置数据管理类"""
-    def __init__(self):
-        self.config_file = "limiter_config.json"
-        self.default_config = {
-            "time_limit_minutes": 30,
-            "warning_minutes": 5,
-            "password": "1234",
-            "auto_start": False,
-            "strict_mode": True
-        }
-        self.config = self.load_config()
-    
-    def load_config(self):
-        """加载配置"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"加载配置失败: {e}")
-        return self.default_config.copy()
-    
-    def save_config(self):
-        """保存配置"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-            print("配置保存成功")
-        except Exception as e:
-            print(f"保存配置失败: {e}")
+# 主界面状态文字
+STATUS_TEXTS = {
+    STATUS_IDLE: "手机使用时间限制器 (桌面版)",
+    STATUS_RUNNING: "计时中... (桌面版)",
+    STATUS_LOCKED: "限制模式 - 仅通话功能 (桌面版)",
+}
 
 class PhoneApp:
     """模拟手机应用的类"""
-    def __init__(self, name, icon="app.png", is_call_related=False, category="其他"):
+    def __init__(self, name, icon="app.png", is_call_related=False, category="其他", package=None,
+                 version_code=0):
         self.name = name
+        self.package = package
+        self.version_code = version_code
         self.icon = icon
         self.is_call_related = is_call_related
         self.category = category
@@ -126,43 +102,86 @@ def create_button(text, **kwargs):
     button_kwargs.update(kwargs)
     return Button(**button_kwargs)
 
+# 格子状态对应的按钮颜色
+TILE_COLORS = {
+    TILE_CALL: COLOR_CALL,
+    TILE_BLOCKED: COLOR_BLOCKED,
+    TILE_NORMAL: COLOR_NORMAL,
+}
+
 class MainScreen(Screen):
     """主屏幕"""
-    def __init__(self, **kwargs):
+    def __init__(self, clock=None, scheduler=None, **kwargs):
         super(MainScreen, self).__init__(**kwargs)
         self.name = 'main'
         
-        # 初始化设置数据
-        self.settings = SettingsData()
-        
-        # 初始化应用状态
-        self.time_limit = self.settings.config["time_limit_minutes"] * 60
-        self.time_remaining = self.time_limit
-        self.timer_running = False
-        self.start_time = None
-        self.warning_shown = False
-        self.time_up = False
+        # 时间源和调度器可注入，测试时换成虚拟时钟即可快进；
+        # 默认时间源不受修改系统时间和设备休眠影响
+        self.clock = clock or TrustedClock(on_wall_jump=self.on_wall_clock_jump,
+                                           anchor_path=CLOCK_ANCHOR_FILE)
+        self.scheduler = scheduler or default_scheduler()
+        
+        # 初始化设置数据，设置变化时重新计算相关状态
+        self.settings = SettingsData.shared()
+        self.settings.subscribe(self.on_settings_changed)
+        
+        # 可选的回调延迟/漂移统计（调试用）
+        if tick_stats.is_enabled(self.settings.config):
+            self.scheduler = tick_stats.InstrumentedScheduler(self.scheduler, tick_stats.enable())
+        
+        # 倒计时刷新间隔
+        self.refresh_interval = self.settings.config.refresh_seconds
+        self.idle_refresh_interval = self.settings.config.idle_refresh_seconds
+        
+        # 使用记录，缓冲后定时写盘
+        self.ledger = UsageLedger(scheduler=self.scheduler, clock=self.clock.time)
+        
+        # 计时、配额、时段和放行判断与快进模拟器共用，界面只负责显示
+        self.limiter = LimiterController(
+            self.settings.config,
+            self.clock,
+            self.scheduler,
+            on_warning=self.on_time_warning,
+            on_expired=self.on_time_expired,
+            on_quota_exhausted=self.on_quota_exhausted,
+            on_state_changed=self.update_app_grid,
+            on_tick=self.update_ui,
+            tick_interval=self.refresh_interval,
+            journal=SessionJournal(),
+            ledger=self.ledger,
+            quota_state_path=QUOTA_STATE_FILE
+        )
+        self.engine = self.limiter.engine
+        self.quota = self.limiter.quota
         
         # 创建应用列表
         self.apps = [
-            PhoneApp("电话", is_call_related=True, category="通讯"),
-            PhoneApp("紧急联系", is_call_related=True, category="通讯"),
-            PhoneApp("短信", category="通讯"),
-            PhoneApp("微信", category="社交"),
-            PhoneApp("QQ", category="社交"),
-            PhoneApp("浏览器", category="工具"),
-            PhoneApp("相机", category="媒体"),
-            PhoneApp("游戏中心", category="娱乐"),
-            PhoneApp("音乐", category="媒体"),
-            PhoneApp("视频", category="媒体"),
-            PhoneApp("设置", category="系统"),
-            PhoneApp("计算器", category="工具")
+            PhoneApp("电话", "phone.png", is_call_related=True, category="通讯"),
+            PhoneApp("紧急联系", "emergency.png", is_call_related=True, category="通讯"),
+            PhoneApp("短信", "sms.png", category="通讯"),
+            PhoneApp("微信", "wechat.png", category="社交"),
+            PhoneApp("QQ", "qq.png", category="社交"),
+            PhoneApp("浏览器", "browser.png", category="工具"),
+            PhoneApp("相机", "camera.png", category="媒体"),
+            PhoneApp("游戏中心", "game.png", category="娱乐"),
+            PhoneApp("音乐", "music.png", category="媒体"),
+            PhoneApp("视频", "video.png", category="媒体"),
+            PhoneApp("设置", "settings.png", category="系统"),
+            PhoneApp("计算器", "calculator.png", category="工具")
         ]
+        self.icon_cache = None
+        if self.settings.config.show_installed_apps:
+            self.load_installed_apps()
+        
+        # 复用的弹窗池
+        self.popups = PopupManager(label_factory=create_label, button_factory=create_button)
         
         self.build_ui()
         
-        # 设置定时器更新UI
-        Clock.schedule_interval(self.update_ui, 1)
+        # 恢复上次退出前的计时状态
+        if self.limiter.restore():
+            self.start_timer(None)
+        self.update_ui(self.engine.remaining())
     
     def build_ui(self):
         """构建用户界面"""
@@ -196,7 +215,7 @@ class MainScreen(Screen):
         
         # 时间显示
         self.time_label = create_label(
-            f"剩余时间: {self.settings.config['time_limit_minutes']:02d}:00",
+            f"剩余时间: {self.settings.config.time_limit_minutes:02d}:00",
             size_hint=(1, 0.1),
             font_size='24sp'
         )
@@ -209,6 +228,12 @@ class MainScreen(Screen):
             color=(0.2, 0.8, 0.2, 1)
         )
         main_layout.add_widget(self.progress_label)
+        self.renderer = StatusRenderer(
+            self.time_label,
+            self.progress_label,
+            self.status_label,
+            status_texts=STATUS_TEXTS
+        )
         
         # 控制按钮
         control_layout = BoxLayout(size_hint=(1, 0.1), spacing=10)
@@ -246,7 +271,14 @@ class MainScreen(Screen):
         apps_label.bind(size=apps_label.setter('text_size'))
         main_layout.add_widget(apps_label)
         
-        self.app_grid = GridLayout(cols=3, spacing=5, size_hint=(1, 0.6))
+        # 虚拟化列表，只为屏幕上可见的行创建控件
+        self.app_grid = AppLauncherView(
+            self.open_app,
+            font_name='Chinese' if font_available else None,
+            icons=IconAtlas(),
+            icon_cache=self.icon_cache,
+            size_hint=(1, 0.6)
+        )
         self.update_app_grid()
         main_layout.add_widget(self.app_grid)
         
@@ -257,117 +289,91 @@ class MainScreen(Screen):
         self.rect.size = instance.size
         self.rect.pos = instance.pos
     
+    def load_installed_apps(self):
+        """把设备上已安装的应用加入列表"""
+        try:
+            from android_permissions import AndroidPermissionManager
+            manager = AndroidPermissionManager()
+            self.icon_cache = IconCache(manager.load_app_icon)
+            known = {app.name for app in self.apps}
+            for info in manager.get_installed_apps():
+                if info["name"] not in known:
+                    known.add(info["name"])
+                    # 不用默认图标，格子才会向 IconCache 请求真实图标
+                    self.apps.append(PhoneApp(
+                        info["name"],
+                        icon=None,
+                        package=info.get("package"),
+                        version_code=info.get("version_code", 0)
+                    ))
+        except Exception as e:
+            print(f"加载已安装应用失败: {e}")
+    
     def update_app_grid(self):
-        """更新应用网格"""
-        self.app_grid.clear_widgets()
-        
-        for app in self.apps:
-            # 检查是否应该显示此应用
-            if self.time_up and not app.is_call_related:
-                continue
-                
-            app_layout = BoxLayout(orientation='vertical', spacing=2)
-            
-            app_button = create_button(
-                app.name,
-                size_hint=(1, 0.8)
-            )
-            
-            # 设置按钮颜色
-            if app.is_call_related:
-                app_button.background_color = (0.2, 0.8, 0.2, 1)  # 绿色 - 通话应用
-            elif self.time_up:
-                app_button.background_color = (0.5, 0.5, 0.5, 1)  # 灰色 - 禁用
-            else:
-                app_button.background_color = (0.4, 0.6, 0.9, 1)  # 蓝色 - 普通应用
-                
-            app_button.bind(on_press=lambda btn, app_name=app.name: self.open_app(app_name))
-            app_layout.add_widget(app_button)
-            
-            # 应用类别标签
-            category_label = create_label(
-                app.category,
-                size_hint=(1, 0.2),
-                font_size='10sp',
-                color=(0.5, 0.5, 0.5, 1)
-            )
-            app_layout.add_widget(category_label)
-            
-            self.app_grid.add_widget(app_layout)
+        """更新应用网格，只改动状态变化的格子"""
+        self.app_grid.sync(self.apps, self.app_tile_state)
+    
+    def app_tile_state(self, app):
+        """应用格子的 (是否显示, 按钮颜色)"""
+        state = self.limiter.tile_state(app)
+        if state == TILE_HIDDEN:
+            return False, None
+        return True, TILE_COLORS[state]
     
     def open_app(self, app_name):
         """打开应用"""
-        if self.time_up:
-            app = next((a for a in self.apps if a.name == app_name), None)
-            if app and not app.is_call_related:
-                self.show_popup("访问受限", f"使用时间已到！\n只能使用通话相关功能。\n\n如需解除限制，请输入管理密码。", show_password=True)
-                return
+        app = next((a for a in self.apps if a.name == app_name), None)
+        if app is None:
+            return
+        
+        result = self.limiter.open_app(app)
+        if result == DENIED_TIME_UP:
+            self.show_popup("访问受限", f"使用时间已到！\n只能使用通话相关功能。\n\n如需解除限制，请输入管理密码。", show_password=True)
+            return
+        if result == DENIED_SCHEDULE:
+            self.show_popup("时段限制", f"当前时段不允许使用 {app_name}。\n\n只能使用通话相关功能。")
+            return
+        if result == DENIED_QUOTA:
+            self.show_popup("额度已用完", f"{app_name} 今日的使用额度已用完！\n\n明天再来吧。")
+            return
+        
+        # 弹窗代表应用处于前台，关闭即回到启动器
+        on_dismiss = self.on_app_closed
         
         # 模拟打开应用
         if app_name in ["电话", "紧急联系"]:
-            self.show_popup("通话功能", f"正在启动 {app_name}\n\n这是允许的通话功能。\n\n在真实手机上，这里会打开拨号界面。")
+            self.show_popup("通话功能", f"正在启动 {app_name}\n\n这是允许的通话功能。\n\n在真实手机上，这里会打开拨号界面。", on_dismiss=on_dismiss)
         else:
-            self.show_popup("应用启动", f"正在打开 {app_name}\n\n在真实手机上，这里会启动对应的应用程序。")
+            self.show_popup("应用启动", f"正在打开 {app_name}\n\n在真实手机上，这里会启动对应的应用程序。", on_dismiss=on_dismiss)
     
-    def show_popup(self, title, content, show_password=False):
-        """显示弹窗"""
-        popup_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        
-        content_label = create_label(
-            content,
-            text_size=(300, None),
-            halign='center',
-            valign='middle'
-        )
-        popup_layout.add_widget(content_label)
-        
+    def on_app_closed(self):
+        """模拟的应用关闭，回到启动器"""
+        self.limiter.close_app()
+    
+    def show_popup(self, title, content, show_password=False, on_dismiss=None):
+        """显示弹窗，同一标题的弹窗已打开时只更新内容"""
         if show_password:
-            password_input = TextInput(
-                hint_text="请输入管理密码",
-                password=True,
-                size_hint=(1, None),
-                height=40,
-                multiline=False
+            return self.popups.show(
+                title,
+                content,
+                verify=self.check_password,
+                on_unlock=self.on_unlocked,
+                on_dismiss=on_dismiss
             )
-            popup_layout.add_widget(password_input)
-            
-            button_layout = BoxLayout(size_hint=(1, None), height=40, spacing=10)
-            
-            def check_password(instance):
-                if password_input.text == self.settings.config["password"]:
-                    popup.dismiss()
-                    self.reset_timer(None)
-                    self.show_popup("解锁成功", "限制已解除，可以正常使用手机。")
-                else:
-                    password_input.text = ""
-                    content_label.text = content + "\n\n密码错误，请重试！"
-            
-            confirm_btn = create_button("确认")
-            confirm_btn.bind(on_press=check_password)
-            button_layout.add_widget(confirm_btn)
-            
-            cancel_btn = create_button("取消")
-            cancel_btn.bind(on_press=lambda x: popup.dismiss())
-            button_layout.add_widget(cancel_btn)
-            
-            popup_layout.add_widget(button_layout)
-        else:
-            close_btn = create_button("确定", size_hint=(1, None), height=40)
-            close_btn.bind(on_press=lambda x: popup.dismiss())
-            popup_layout.add_widget(close_btn)
-        
-        popup = Popup(
-            title=title,
-            content=popup_layout,
-            size_hint=(0.9, 0.6)
-        )
-        popup.open()
+        return self.popups.show(title, content, on_dismiss=on_dismiss)
+    
+    def check_password(self, text):
+        """检查管理密码"""
+        return text == self.settings.config.password
+    
+    def on_unlocked(self):
+        """密码验证通过"""
+        self.reset_timer(None, unlock=True)
+        self.show_popup("解锁成功", "限制已解除，可以正常使用手机。")
     
     def start_timer(self, instance):
         """开始计时"""
-        if not self.timer_running:
-            self.timer_running = True
-            self.start_time = datetime.now()
+        if self.limiter.start():
             self.start_button.text = "运行中"
             self.start_button.disabled = True
             self.pause_button.disabled = False
@@ -375,74 +381,63 @@ class MainScreen(Screen):
     
     def pause_timer(self, instance):
         """暂停计时"""
-        self.timer_running = False
+        self.limiter.pause()
         self.start_button.text = "继续"
         self.start_button.disabled = False
         self.pause_button.disabled = True
         self.start_button.background_color = (0.2, 0.8, 0.3, 1)
     
-    def reset_timer(self, instance):
+    def reset_timer(self, instance, unlock=False):
         """重置计时器"""
-        self.timer_running = False
-        self.time_remaining = self.time_limit
-        self.warning_shown = False
-        self.time_up = False
+        self.limiter.reset(unlock)
         self.start_button.text = "开始限时"
         self.start_button.disabled = False
         self.pause_button.disabled = True
         self.start_button.background_color = (0.2, 0.8, 0.3, 1)
-        self.update_app_grid()
     
-    def update_ui(self, dt):
-        """更新UI"""
-        if self.timer_running:
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            self.time_remaining = max(0, self.time_limit - elapsed)
-            
-            # 检查警告
-            warning_threshold = self.settings.config["warning_minutes"] * 60
-            if self.time_remaining <= warning_threshold and not self.warning_shown:
-                self.warning_shown = True
-                self.show_popup("时间警告", f"还剩 {self.settings.config['warning_minutes']} 分钟使用时间！\n请准备结束当前活动。")
-            
-            # 检查时间是否用完
-            if self.time_remaining <= 0 and not self.time_up:
-                self.time_up = True
-                self.timer_running = False
-                self.show_popup("时间到", "使用时间已结束！\n现在只能使用通话功能。\n\n如需继续使用，请输入管理密码。", show_password=True)
-                self.update_app_grid()
-        
-        # 更新时间显示
-        minutes = int(self.time_remaining // 60)
-        seconds = int(self.time_remaining % 60)
-        self.time_label.text = f"剩余时间: {minutes:02d}:{seconds:02d}"
-        
-        # 更新进度条
-        if self.time_limit > 0:
-            progress = self.time_remaining / self.time_limit
-            bar_length = 20
-            filled = int(progress * bar_length)
-            bar = "█" * filled + "░" * (bar_length - filled)
-            self.progress_label.text = bar
-            
-            # 根据剩余时间改变颜色
-            if progress > 0.5:
-                self.progress_label.color = (0.2, 0.8, 0.2, 1)  # 绿色
-            elif progress > 0.2:
-                self.progress_label.color = (0.9, 0.7, 0.2, 1)  # 黄色
-            else:
-                self.progress_label.color = (0.9, 0.2, 0.2, 1)  # 红色
-        
-        # 更新状态显示
-        if self.time_up:
-            self.status_label.text = "限制模式 - 仅通话功能 (桌面版)"
-            self.status_label.color = (0.9, 0.2, 0.2, 1)
-        elif self.timer_running:
-            self.status_label.text = "计时中... (桌面版)"
-            self.status_label.color = (0.2, 0.7, 0.2, 1)
-        else:
-            self.status_label.text = "手机使用时间限制器 (桌面版)"
-            self.status_label.color = (0.2, 0.2, 0.2, 1)
+    def on_time_warning(self):
+        """到达警告阈值"""
+        self.show_popup("时间警告", f"还剩 {self.settings.config.warning_minutes} 分钟使用时间！\n请准备结束当前活动。")
+    
+    def on_time_expired(self):
+        """使用时间用完"""
+        self.show_popup("时间到", "使用时间已结束！\n现在只能使用通话功能。\n\n如需继续使用，请输入管理密码。", show_password=True)
+    
+    def on_quota_exhausted(self, key):
+        """某个分类或应用的每日额度用完"""
+        app = self.quota.foreground
+        if app and key in self.quota.quota_keys(app):
+            self.show_popup("额度已用完", f"{app.name} 今日的使用额度已用完！")
+    
+    def on_idle(self):
+        """长时间没有操作，降低倒计时刷新频率"""
+        self.engine.set_tick_interval(self.idle_refresh_interval)
+    
+    def on_active(self):
+        """恢复操作，立即刷新倒计时"""
+        self.engine.set_tick_interval(self.refresh_interval)
+    
+    def on_background(self):
+        """进入后台时停止倒计时刷新，截止时间回调照常生效"""
+        self.engine.set_tick_interval(0)
+    
+    def on_settings_changed(self, changed):
+        """设置变化后只重新计算受影响的部分"""
+        config = self.settings.config
+        self.limiter.configure(config, changed)
+        if "idle_refresh_seconds" in changed:
+            self.idle_refresh_interval = config.idle_refresh_seconds
+        if "refresh_seconds" in changed:
+            self.refresh_interval = config.refresh_seconds
+            self.engine.set_tick_interval(self.refresh_interval)
+    
+    def on_wall_clock_jump(self, delta):
+        """系统时间被修改，计时和时段判断继续使用推算的时间"""
+        print(f"检测到系统时间跳变 {delta:+.0f} 秒，已忽略")
+    
+    def update_ui(self, remaining):
+        """更新UI，只写入变化的标签属性"""
+        self.renderer.render(remaining, self.limiter.time_limit, self.limiter.time_up, self.engine.running)
     
     def open_settings(self, instance):
         """打开设置界面"""
@@ -453,11 +448,20 @@ class SettingsScreen(Screen):
     def __init__(self, **kwargs):
         super(SettingsScreen, self).__init__(**kwargs)
         self.name = 'settings'
-        self.settings = SettingsData()
+        self.settings = SettingsData.shared()
+        self.title_taps = 0
         self.build_ui()
+        self.loaded_values = self.form_values()
+        # 外部推送或切换方案后刷新界面，避免保存时写回旧值
+        self.settings.subscribe(self.on_settings_changed)
     
     def build_ui(self):
         """构建设置界面"""
+        # 滑块、开关和输入框只有设置界面使用，第一次打开时才导入
+        from kivy.uix.slider import Slider
+        from kivy.uix.switch import Switch
+        from kivy.uix.textinput import TextInput
+        
         main_layout = BoxLayout(orientation='vertical', padding=20, spacing=15)
         
         # 标题栏
@@ -476,6 +480,7 @@ class SettingsScreen(Screen):
             size_hint=(0.6, 1),
             font_size='20sp'
         )
+        title_label.bind(on_touch_down=self.on_title_touch)
         title_layout.add_widget(title_label)
         
         save_btn = create_button(
@@ -496,7 +501,7 @@ class SettingsScreen(Screen):
         time_layout.add_widget(create_label("使用时间限制 (分钟):", halign='left', size_hint=(1, 0.4)))
         
         self.time_slider = Slider(
-            min=5, max=180, value=self.settings.config["time_limit_minutes"],
+            min=5, max=180, value=self.settings.config.time_limit_minutes,
             step=5, size_hint=(1, 0.6)
         )
         self.time_value_label = create_label(
@@ -514,7 +519,7 @@ class SettingsScreen(Screen):
         warning_layout.add_widget(create_label("提前警告时间 (分钟):", halign='left', size_hint=(1, 0.4)))
         
         self.warning_slider = Slider(
-            min=1, max=15, value=self.settings.config["warning_minutes"],
+            min=1, max=15, value=self.settings.config.warning_minutes,
             step=1, size_hint=(1, 0.6)
         )
         self.warning_value_label = create_label(
@@ -532,7 +537,7 @@ class SettingsScreen(Screen):
         password_layout.add_widget(create_label("管理密码:", halign='left', size_hint=(1, 0.4)))
         
         self.password_input = TextInput(
-            text=self.settings.config["password"],
+            text=self.settings.config.password,
             password=True,
             size_hint=(1, 0.6),
             multiline=False
@@ -545,16 +550,23 @@ class SettingsScreen(Screen):
         
         auto_start_layout = BoxLayout(size_hint=(1, None), height=40)
         auto_start_layout.add_widget(create_label("启动时自动开始计时:", halign='left'))
-        self.auto_start_switch = Switch(active=self.settings.config["auto_start"])
+        self.auto_start_switch = Switch(active=self.settings.config.auto_start)
         auto_start_layout.add_widget(self.auto_start_switch)
         switch_layout.add_widget(auto_start_layout)
         
         strict_mode_layout = BoxLayout(size_hint=(1, None), height=40)
         strict_mode_layout.add_widget(create_label("严格模式 (桌面版仅模拟):", halign='left'))
-        self.strict_mode_switch = Switch(active=self.settings.config["strict_mode"])
+        self.strict_mode_switch = Switch(active=self.settings.config.strict_mode)
         strict_mode_layout.add_widget(self.strict_mode_switch)
         switch_layout.add_widget(strict_mode_layout)
         
+        overlay_layout = BoxLayout(size_hint=(1, None), height=40)
+        overlay_layout.add_widget(create_label("性能浮层:", halign='left'))
+        self.overlay_switch = Switch(active=App.get_running_app().overlay.active)
+        self.overlay_switch.bind(active=self.on_overlay_switch)
+        overlay_layout.add_widget(self.overlay_switch)
+        switch_layout.add_widget(overlay_layout)
+        
         settings_layout.add_widget(switch_layout)
         
         # 说明文字
@@ -568,8 +580,55 @@ class SettingsScreen(Screen):
         settings_layout.add_widget(info_label)
         
         main_layout.add_widget(settings_layout)
+        
+        # 隐藏的调试面板，连续点击标题5次显示
+        self.debug_label = create_label(
+            "",
+            size_hint=(1, None),
+            height=0,
+            opacity=0,
+            font_size='11sp',
+            color=(0.4, 0.4, 0.4, 1)
+        )
+        main_layout.add_widget(self.debug_label)
+        
         self.add_widget(main_layout)
     
+    def on_title_touch(self, instance, touch):
+        """连续点击标题切换调试面板"""
+        if not instance.collide_point(*touch.pos):
+            return
+        self.title_taps += 1
+        if self.title_taps >= 5:
+            self.title_taps = 0
+            self.toggle_debug_panel()
+    
+    def toggle_debug_panel(self):
+        """显示或隐藏回调统计"""
+        if self.debug_label.opacity:
+            self.debug_label.opacity = 0
+            self.debug_label.height = 0
+            return
+        stats = tick_stats.active_stats()
+        if stats is None:
+            self.debug_label.text = f"回调统计未开启\n设置环境变量 {tick_stats.ENV_FLAG}=1 或配置 debug_tick_stats"
+        else:
+            self.debug_label.text = stats.format_summary()
+        main_screen = App.get_running_app().main_screen
+        self.debug_label.text += "\n" + main_screen.renderer.format_summary()
+        self.debug_label.text += "\n" + main_screen.popups.format_summary()
+        self.debug_label.text += "\n" + App.get_running_app().governor.format_summary()
+        self.debug_label.opacity = 1
+        self.debug_label.height = 160
+    
+    def on_overlay_switch(self, instance, value):
+        """立即显示或隐藏性能浮层"""
+        overlay = App.get_running_app().overlay
+        if value:
+            overlay.start()
+        else:
+            overlay.stop()
+    
     def update_time_label(self, instance, value):
         """更新时间标签"""
         self.time_value_label.text = f"{int(value)} 分钟"
@@ -578,20 +637,53 @@ class SettingsScreen(Screen):
         """更新警告时间标签"""
         self.warning_value_label.text = f"{int(value)} 分钟"
     
+    def form_values(self):
+        """界面上各项当前的值"""
+        return {
+            "time_limit_minutes": int(self.time_slider.value),
+            "warning_minutes": int(self.warning_slider.value),
+            "password": self.password_input.text,
+            "auto_start": self.auto_start_switch.active,
+            "strict_mode": self.strict_mode_switch.active,
+            "perf_overlay": self.overlay_switch.active
+        }
+    
+    def load_values(self):
+        """从设置存储重新读取各项"""
+        config = self.settings.config
+        self.time_slider.value = config.time_limit_minutes
+        self.warning_slider.value = config.warning_minutes
+        self.password_input.text = config.password
+        self.auto_start_switch.active = config.auto_start
+        self.strict_mode_switch.active = config.strict_mode
+        # 未保存的浮层开关也还原，浮层随开关显示或隐藏
+        self.overlay_switch.active = config.perf_overlay
+        self.loaded_values = self.form_values()
+    
+    def on_pre_enter(self, *args):
+        """每次进入设置界面都显示存储中的最新值"""
+        self.load_values()
+    
+    def on_settings_changed(self, changed):
+        """设置在别处被修改，界面上没有未保存的改动时同步显示"""
+        if self.form_values() == self.loaded_values:
+            self.load_values()
+    
     def save_settings(self, instance):
         """保存设置"""
-        self.settings.config["time_limit_minutes"] = int(self.time_slider.value)
-        self.settings.config["warning_minutes"] = int(self.warning_slider.value)
-        self.settings.config["password"] = self.password_input.text
-        self.settings.config["auto_start"] = self.auto_start_switch.active
-        self.settings.config["strict_mode"] = self.strict_mode_switch.active
+        # 只写入界面上改动过的项，其他项保持存储中的值
+        values = self.form_values()
+        changes = {key: value for key, value in values.items() if value != self.loaded_values[key]}
+        self.loaded_values = values
         
-        self.settings.save_config()
+        # 保存并通知主界面，立即生效
+        self.settings.update(changes)
         
         # 显示保存成功提示
+        from kivy.uix.popup import Popup
         popup = Popup(
             title="保存成功",
-            content=create_label("设置已保存！\n返回主界面后生效。"),
+            content=create_label("设置已保存，已立即生效。"),
             size_hint=(0.7, 0.4)
         )
         popup.open()
@@ -606,17 +698,79 @@ class PhoneTimeLimiterApp(App):
         # 设置窗口标题
         self.title = "手机时间限制器 - 桌面版"
         
-        # 创建屏幕管理器
-        sm = ScreenManager()
+        # 创建屏幕管理器，设置界面第一次打开时才构建
+        sm = LazyScreenManager()
         
         # 添加屏幕
-        main_screen = MainScreen()
-        settings_screen = SettingsScreen()
+        self.main_screen = MainScreen()
+        TRACE.mark("构建主界面")
+        
+        sm.add_widget(self.main_screen)
+        sm.register('settings', SettingsScreen)
+        
+        # 无操作一段时间后降低帧率
+        config = self.main_screen.settings.config
+        self.governor = IdleGovernor(
+            Window,
+            Clock,
+            idle_after=config.idle_after_seconds,
+            idle_fps=config.idle_fps,
+            on_idle=self.main_screen.on_idle,
+            on_active=self.main_screen.on_active,
+            on_background=self.main_screen.on_background
+        )
         
-        sm.add_widget(main_screen)
-        sm.add_widget(settings_screen)
+        # 性能浮层，设置页面或环境变量开启
+        self.overlay = perf_overlay.PerfOverlay(
+            Window,
+            Clock,
+            sm,
+            font_name='Chinese' if font_available else None
+        )
         
+        TRACE.watch_first_frame(Window)
         return sm
+    
+    def on_start(self):
+        """首帧之后再预建弹窗"""
+        Clock.schedule_once(lambda dt: self.main_screen.popups.warm(), 1)
+        if perf_overlay.is_enabled(self.main_screen.settings.config):
+            self.overlay.start()
+        
+        # 管理工具推送的新配置文件，运行中直接生效
+        settings = self.main_screen.settings
+        self.watcher = None
+        if settings.config.watch_config:
+            self.watcher = ConfigWatcher(
+                settings.config_file,
+                settings.reload,
+                poll_interval=settings.config.watch_poll_seconds,
+                dispatch=lambda callback: Clock.schedule_once(lambda dt: callback())
+            ).start()
+    
+    def on_pause(self):
+        """进入后台时降低帧率，同步会话日志、使用记录、配额和配置"""
+        self.governor.set_background(True)
+        self.main_screen.engine.journal.sync()
+        self.main_screen.ledger.flush(sync=True)
+        self.main_screen.quota.flush()
+        self.main_screen.settings.flush()
+        return True
+    
+    def on_resume(self):
+        """回到前台时恢复帧率和倒计时刷新"""
+        self.main_screen.clock.check_wall_jump()
+        self.governor.set_background(False)
+    
+    def on_stop(self):
+        """退出时同步会话日志、使用记录、配额和配置"""
+        self.main_screen.engine.journal.close()
+        self.main_screen.ledger.flush(sync=True)
+        self.main_screen.quota.flush()
+        self.main_screen.settings.flush()
+        self.overlay.stop()
+        if self.watcher:
+            self.watcher.stop()
 
 if __name__ == '__main__':
     print("启动手机时间限制器...")
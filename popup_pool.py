@@ -0,0 +1,185 @@
+"""
+弹窗池模块
+预先构建少量对话框外壳并重复使用，每次只替换标题和内容；
+同一标题的弹窗已经打开时只更新内容，不再叠加新的弹窗
+"""
+
+import time
+
+from kivy.clock import Clock
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+
+from tick_stats import RingBuffer
+
+# 关闭动画结束后才把外壳放回池中，避免动画中被重新打开
+RELEASE_DELAY = 0.2
+
+
+class DialogShell:
+    """一个可复用的对话框：内容标签、密码输入行和确定按钮"""
+
+    def __init__(self, pool, label_factory, button_factory):
+        # 弹窗和输入框模块在第一次创建对话框时才导入，不拖慢启动
+        from kivy.uix.popup import Popup
+        from kivy.uix.textinput import TextInput
+
+        self.pool = pool
+        self.title = None
+        self.content = ""
+        self.verify = None
+        self.on_unlock = None
+        self.on_dismiss = None
+        self.password_mode = None
+
+        self.layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.content_label = label_factory(
+            text="",
+            text_size=(300, None),
+            halign='center',
+            valign='middle'
+        )
+        self.password_input = TextInput(
+            hint_text="请输入管理密码",
+            password=True,
+            size_hint=(1, None),
+            height=40,
+            multiline=False
+        )
+        self.button_layout = BoxLayout(size_hint=(1, None), height=40, spacing=10)
+        confirm_btn = button_factory(text="确认")
+        confirm_btn.bind(on_press=self._confirm)
+        self.button_layout.add_widget(confirm_btn)
+        cancel_btn = button_factory(text="取消")
+        cancel_btn.bind(on_press=self._close)
+        self.button_layout.add_widget(cancel_btn)
+        self.close_btn = button_factory(text="确定", size_hint=(1, None), height=40)
+        self.close_btn.bind(on_press=self._close)
+
+        self.popup = Popup(content=self.layout, size_hint=(0.9, 0.6))
+        self.popup.bind(on_dismiss=self._dismissed)
+
+    def fill(self, title, content, verify=None, on_unlock=None, on_dismiss=None):
+        """填入新内容，只在对话框类型变化时调整子控件"""
+        self.title = title
+        self.content = content
+        self.verify = verify
+        self.on_unlock = on_unlock
+        self.on_dismiss = on_dismiss
+        self.popup.title = title
+        self.content_label.text = content
+
+        password_mode = verify is not None
+        if password_mode != self.password_mode:
+            self.password_mode = password_mode
+            self.layout.clear_widgets()
+            self.layout.add_widget(self.content_label)
+            if password_mode:
+                self.layout.add_widget(self.password_input)
+                self.layout.add_widget(self.button_layout)
+            else:
+                self.layout.add_widget(self.close_btn)
+        self.password_input.text = ""
+
+    def _confirm(self, instance):
+        text = self.password_input.text
+        self.password_input.text = ""
+        if self.verify(text):
+            on_unlock = self.on_unlock
+            self.popup.dismiss()
+            if on_unlock:
+                on_unlock()
+        else:
+            self.content_label.text = self.content + "\n\n密码错误，请重试！"
+
+    def _close(self, instance):
+        self.popup.dismiss()
+
+    def _dismissed(self, popup):
+        on_dismiss = self.on_dismiss
+        self.verify = self.on_unlock = self.on_dismiss = None
+        self.pool.release(self)
+        if on_dismiss:
+            on_dismiss()
+
+
+class PopupManager:
+    """对话框池
+
+    show() 优先复用空闲外壳；标题相同的弹窗已打开时直接更新其内容。
+    外壳在 warm() 或第一次 show() 时才构建。
+    同时统计打开耗时和同时存在的弹窗数。
+    """
+
+    def __init__(self, label_factory=Label, button_factory=Button, pool_size=2,
+                 clock=time.perf_counter):
+        self.label_factory = label_factory
+        self.button_factory = button_factory
+        self.pool_size = pool_size
+        self.clock = clock
+        self.free = []
+        self.live = {}
+        self.created = 0
+        self.reused = 0
+        self.deduplicated = 0
+        self.peak_live = 0
+        self.latency = RingBuffer(256)
+
+    def _new_shell(self):
+        return DialogShell(self, self.label_factory, self.button_factory)
+
+    def warm(self):
+        """预先构建外壳填满空闲池，适合在首帧之后的空闲时间调用"""
+        while len(self.free) + len(self.live) < self.pool_size:
+            self.free.append(self._new_shell())
+            self.created += 1
+
+    def show(self, title, content, verify=None, on_unlock=None, on_dismiss=None):
+        """打开弹窗并返回其 Popup
+
+        verify(text) -> bool 不为空时显示密码输入框，验证通过后关闭弹窗并调用 on_unlock()。
+        """
+        start = self.clock()
+        shell = self.live.get(title)
+        if shell is not None:
+            # 同一标题的弹窗已打开，只更新内容
+            self.deduplicated += 1
+            shell.fill(title, content, verify, on_unlock, on_dismiss or shell.on_dismiss)
+        else:
+            if self.free:
+                shell = self.free.pop()
+                self.reused += 1
+            else:
+                shell = self._new_shell()
+                self.created += 1
+            shell.fill(title, content, verify, on_unlock, on_dismiss)
+            self.live[title] = shell
+            self.peak_live = max(self.peak_live, len(self.live))
+            shell.popup.open()
+        self.latency.append(self.clock() - start)
+        return shell.popup
+
+    def release(self, shell):
+        """弹窗关闭后调用，动画结束再放回池中"""
+        if self.live.get(shell.title) is shell:
+            del self.live[shell.title]
+        Clock.schedule_once(lambda dt: self._return(shell), RELEASE_DELAY)
+
+    def _return(self, shell):
+        # 池已满时丢弃，多出的外壳由GC回收
+        if len(self.free) < self.pool_size:
+            self.free.append(shell)
+
+    def live_count(self):
+        """当前打开的弹窗数"""
+        return len(self.live)
+
+    def format_summary(self):
+        """调试面板显示的文本"""
+        p50 = self.latency.percentile(0.50)
+        p95 = self.latency.percentile(0.95)
+        latency = "无数据" if p50 is None else f"p50 {p50 * 1000:.1f}ms  p95 {p95 * 1000:.1f}ms"
+        return (f"弹窗: 打开 {len(self.live)} 个（峰值 {self.peak_live}），"
+                f"新建 {self.created}，复用 {self.reused}，合并 {self.deduplicated}\n"
+                f"弹窗打开耗时: {latency}")
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+分类/应用配额模块
+按 PhoneApp.category 和应用名分别设置每日额度，通话相关应用不受限制；
+当天的已用时间由后台线程写入状态文件，杀进程或重启后不会重新变满
+"""
+
+import time
+
+from config_file import ConfigWriter, read_config
+from session_scheduler import SessionScheduler
+from usage_account import NS_PER_SECOND
+
+QUOTA_CATEGORY = "category"
+QUOTA_APP = "app"
+
+QUOTA_STATE_FILE = "limiter_quota.json"
+# 状态变化后最多等多少秒提交写盘，进入后台或退出时立即写入
+QUOTA_SAVE_DELAY = 10.0
+
+
+class QuotaEngine:
+    """每日配额引擎
+
+    每个配额是 SessionScheduler 中的一个会话，到时由调度器触发，
+    切换前台应用时只暂停/开始该应用相关的最多两个配额，代价为 O(1)；
+    状态只标记为待保存，由定时器提交给后台写入器，界面线程上不做文件读写。
+    进入后台或退出时调用 flush()。
+    """
+
+    def __init__(self, category_limits=None, app_limits=None, on_exhausted=None,
+                 clock=time.monotonic_ns, scheduler=None, state_path=None, wall_clock=time.time,
+                 save_delay=QUOTA_SAVE_DELAY):
+        self.on_exhausted = on_exhausted
+        self.sessions = SessionScheduler(on_expire=self._on_expire, clock=clock,
+                                         scheduler=scheduler)
+        self.scheduler = scheduler
+        self.state_path = state_path
+        self.wall_clock = wall_clock
+        self.save_delay = save_delay
+        self.writer = ConfigWriter(state_path) if state_path else None
+        self._save_event = None
+        self.day = self.today()
+        self.foreground = None
+        self._active = ()
+        self.configure(category_limits, app_limits)
+        if state_path:
+            self.load_state()
+
+    def configure(self, category_limits=None, app_limits=None):
+        """设置配额（分钟）
+
+        已有配额只修改限制，当天已用时间和前台应用的计时都保留；
+        当天中途调低限制不会让配额重新变满。
+        """
+        limits = {}
+        for category, minutes in (category_limits or {}).items():
+            limits[(QUOTA_CATEGORY, category)] = float(minutes) * 60
+        for name, minutes in (app_limits or {}).items():
+            limits[(QUOTA_APP, name)] = float(minutes) * 60
+
+        sessions = self.sessions
+        for key in list(sessions.sessions):
+            if key not in limits:
+                sessions.remove_session(key)
+        for key, limit in limits.items():
+            if key in sessions.sessions:
+                sessions.set_limit(key, limit)
+            else:
+                sessions.add_session(key, limit)
+
+        # 前台应用新增或放宽的配额立即开始计时
+        app = self.foreground
+        self._active = self.quota_keys(app) if app is not None else ()
+        for key in self._active:
+            sessions.start(key)
+
+    def quota_keys(self, app):
+        """应用受哪些配额约束"""
+        if app.is_call_related:
+            return ()
+        sessions = self.sessions.sessions
+        keys = []
+        app_key = (QUOTA_APP, app.name)
+        if app_key in sessions:
+            keys.append(app_key)
+        category_key = (QUOTA_CATEGORY, app.category)
+        if category_key in sessions:
+            keys.append(category_key)
+        return tuple(keys)
+
+    def set_foreground(self, app):
+        """前台应用变化，app为None表示回到启动器"""
+        for key in self._active:
+            self.sessions.pause(key)
+        self.foreground = app
+        self._active = self.quota_keys(app) if app is not None else ()
+        for key in self._active:
+            self.sessions.start(key)
+        self.mark_dirty()
+
+    def is_blocked(self, app):
+        """应用的某个配额是否已用完"""
+        sessions = self.sessions.sessions
+        return any(sessions[key].expired for key in self.quota_keys(app))
+
+    def remaining(self, app):
+        """应用可用的剩余秒数，不受配额限制时返回None"""
+        sessions = self.sessions.sessions
+        keys = self.quota_keys(app)
+        if not keys:
+            return None
+        return min(sessions[key].remaining() for key in keys)
+
+    def reset(self):
+        """新的一天，清空所有配额的已用时间"""
+        for key in self._active:
+            self.sessions.pause(key)
+        for key in self.sessions.sessions:
+            self.sessions.reset(key)
+        for key in self._active:
+            self.sessions.start(key)
+        self.day = self.today()
+        self.mark_dirty()
+
+    def today(self):
+        """本地日期，状态文件只在同一天内有效"""
+        return time.strftime("%Y-%m-%d", time.localtime(self.wall_clock()))
+
+    def mark_dirty(self):
+        """状态有变化，预约一次延迟保存；已有预约时不重复预约"""
+        if not self.writer:
+            return
+        if not self.scheduler:
+            self.save_state()
+        elif self._save_event is None:
+            self._save_event = self.scheduler.schedule_once(self._on_save_timer, self.save_delay)
+
+    def _on_save_timer(self, dt):
+        self._save_event = None
+        self.save_state()
+
+    def save_state(self):
+        """把各配额当天的已用时间交给后台写入器，立即返回"""
+        if not self.writer:
+            return
+        used = [
+            [kind, name, session.account.used_ns(), session.running]
+            for (kind, name), session in self.sessions.sessions.items()
+        ]
+        self.writer.save({"day": self.day, "wall": self.wall_clock(), "used": used})
+
+    def flush(self):
+        """立即保存并等待写盘完成（on_pause / on_stop 时调用）"""
+        if self._save_event:
+            self._save_event.cancel()
+            self._save_event = None
+        if not self.writer:
+            return True
+        self.save_state()
+        return self.writer.flush()
+
+    def load_state(self):
+        """恢复当天的已用时间
+
+        保存时仍在计时的配额，把此后经过的墙上时间计为已用，与会话日志的处理一致。
+        """
+        generation, data = read_config(self.state_path)
+        self.writer.generation = generation
+        if not isinstance(data, dict) or data.get("day") != self.day:
+            return
+        elapsed_ns = max(0, int((self.wall_clock() - data.get("wall", 0)) * NS_PER_SECOND))
+        sessions = self.sessions.sessions
+        for kind, name, used_ns, running in data.get("used", []):
+            session = sessions.get((kind, name))
+            if session is None:
+                continue
+            if running:
+                used_ns += elapsed_ns
+            session.account.restore(used_ns)
+            if session.account.remaining_ns() == 0:
+                session.expired = True
+
+    def _on_expire(self, session):
+        self.mark_dirty()
+        if self.on_exhausted:
+            self.on_exhausted(session.session_id)
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+会话日志模块
+以定长记录追加写入计时事件，应用被杀死或被系统回收后可恢复剩余时间
+"""
+
+import os
+import struct
+import time
+import zlib
+
+# 事件类型
+EVENT_START = 1
+EVENT_PAUSE = 2
+EVENT_RESET = 3
+EVENT_UNLOCK = 4
+EVENT_EXPIRE = 5
+EVENT_WARNING = 6
+EVENT_SNAPSHOT = 7
+
+# 状态标志
+FLAG_RUNNING = 0x01
+FLAG_WARNED = 0x02
+FLAG_EXPIRED = 0x04
+
+# 类型, 标志, 时间限制(秒), 已用纳秒, 墙上时间纳秒, CRC32
+RECORD = struct.Struct('<BBxxIqqI')
+_BODY_SIZE = RECORD.size - 4
+
+
+class SessionState:
+    """日志回放得到的会话状态"""
+
+    def __init__(self):
+        self.limit_seconds = 0
+        self.used_ns = 0
+        self.wall_ns = 0
+        self.flags = 0
+
+    @property
+    def running(self):
+        return bool(self.flags & FLAG_RUNNING)
+
+    @property
+    def warned(self):
+        return bool(self.flags & FLAG_WARNED)
+
+    @property
+    def expired(self):
+        return bool(self.flags & FLAG_EXPIRED)
+
+    def apply(self, event, flags, limit_seconds, used_ns, wall_ns):
+        """应用一条记录"""
+        self.limit_seconds = limit_seconds
+        self.used_ns = used_ns
+        self.wall_ns = wall_ns
+        if event == EVENT_SNAPSHOT:
+            self.flags = flags
+        elif event == EVENT_START:
+            self.flags |= FLAG_RUNNING
+        elif event == EVENT_PAUSE:
+            self.flags &= ~FLAG_RUNNING
+        elif event in (EVENT_RESET, EVENT_UNLOCK):
+            self.flags = 0
+        elif event == EVENT_WARNING:
+            self.flags |= FLAG_WARNED
+        elif event == EVENT_EXPIRE:
+            self.flags = (self.flags & ~FLAG_RUNNING) | FLAG_EXPIRED
+
+    def used_at_recovery(self, now_wall_ns=None):
+        """恢复时的已用时间
+
+        最后一条记录为运行中说明进程在计时期间被终止，
+        此后经过的墙上时间按已使用计入，避免杀进程获得额外时间。
+        """
+        if not self.running:
+            return self.used_ns
+        if now_wall_ns is None:
+            now_wall_ns = time.time_ns()
+        return self.used_ns + max(0, now_wall_ns - self.wall_ns)
+
+
+def pack_record(event, flags, limit_seconds, used_ns, wall_ns):
+    """打包一条带校验的记录"""
+    body = RECORD.pack(event, flags, limit_seconds, used_ns, wall_ns, 0)[:_BODY_SIZE]
+    return body + struct.pack('<I', zlib.crc32(body))
+
+
+def iter_records(data):
+    """遍历数据中的有效记录，遇到截断或损坏的记录即停止"""
+    size = RECORD.size
+    for offset in range(0, len(data) - size + 1, size):
+        chunk = data[offset:offset + size]
+        event, flags, limit_seconds, used_ns, wall_ns, crc = RECORD.unpack(chunk)
+        if zlib.crc32(chunk[:_BODY_SIZE]) != crc:
+            return
+        yield event, flags, limit_seconds, used_ns, wall_ns
+
+
+class SessionJournal:
+    """追加写入的会话日志
+
+    每条记录立即写入操作系统缓冲区，进程崩溃不会丢失；
+    fsync 按条数或时间间隔批量执行。日志条数超过阈值时压缩为快照。
+    """
+
+    def __init__(self, path="limiter_session.journal", fsync_interval=30.0,
+                 fsync_batch=16, compact_threshold=512):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self.compact_threshold = compact_threshold
+
+        self.state = SessionState()
+        self.record_count = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+
+        self.load()
+
+    def load(self):
+        """读取快照和日志尾部，回放得到当前状态"""
+        self.state = SessionState()
+        self.record_count = 0
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                for record in iter_records(f.read(RECORD.size)):
+                    self.state.apply(*record)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"读取会话快照失败: {e}")
+
+        valid_size = 0
+        try:
+            with open(self.path, 'rb') as f:
+                for record in iter_records(f.read()):
+                    self.state.apply(*record)
+                    self.record_count += 1
+            valid_size = self.record_count * RECORD.size
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"读取会话日志失败: {e}")
+
+        # 丢弃末尾不完整的记录，后续追加保持对齐
+        self._file = open(self.path, 'ab')
+        if self._file.tell() != valid_size:
+            self._file.truncate(valid_size)
+            self._file.seek(valid_size)
+        return self.state
+
+    def append(self, event, limit_seconds, used_ns, wall_ns=None):
+        """追加一条事件记录"""
+        if wall_ns is None:
+            wall_ns = time.time_ns()
+        self.state.apply(event, 0, limit_seconds, used_ns, wall_ns)
+        try:
+            self._file.write(pack_record(event, self.state.flags, limit_seconds, used_ns, wall_ns))
+            self._file.flush()
+        except Exception as e:
+            print(f"写入会话日志失败: {e}")
+            return
+
+        self.record_count += 1
+        self._pending += 1
+        if (self._pending >= self.fsync_batch
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+        if self.record_count >= self.compact_threshold:
+            self.compact()
+
+    def sync(self):
+        """将已写入的记录刷到磁盘"""
+        if not self._pending or self._file is None:
+            return
+        try:
+            os.fsync(self._file.fileno())
+        except Exception as e:
+            print(f"同步会话日志失败: {e}")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self):
+        """把当前状态写成快照并清空日志"""
+        state = self.state
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(pack_record(EVENT_SNAPSHOT, state.flags, state.limit_seconds,
+                                    state.used_ns, state.wall_ns))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            self._file.truncate(0)
+            self._file.seek(0)
+            os.fsync(self._file.fileno())
+        except Exception as e:
+            print(f"压缩会话日志失败: {e}")
+            return
+        self.record_count = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """同步并关闭日志"""
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
\ No newline at end of file
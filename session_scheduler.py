@@ -0,0 +1,191 @@
+"""
+多会话计时调度模块
+同一进程内管理大量独立的时间预算（共享平板、教室场景），
+所有会话的下一个截止时间保存在最小堆中，每个事件的处理代价为 O(log n)
+"""
+
+import heapq
+import time
+
+from usage_account import UsageAccount, NS_PER_SECOND
+
+# 截止事件类型
+DEADLINE_WARNING = 1
+DEADLINE_EXPIRE = 2
+
+
+class Session:
+    """单个会话（一个孩子/一个配置）"""
+
+    def __init__(self, session_id, time_limit, warning_threshold, clock):
+        self.session_id = session_id
+        self.account = UsageAccount(time_limit, clock)
+        self.warning_ns = int(warning_threshold * NS_PER_SECOND)
+        self.warning_fired = False
+        self.expired = False
+        # 每次状态变化递增，堆中旧代次的条目视为失效
+        self.generation = 0
+
+    @property
+    def running(self):
+        return self.account.running
+
+    def remaining(self):
+        """剩余秒数"""
+        return self.account.remaining()
+
+
+class SessionScheduler:
+    """基于最小堆的多会话调度器
+
+    堆中条目为 (截止时间ns, 序号, 会话ID, 代次, 事件类型)。
+    会话暂停、重置或删除时不从堆中移除条目，只递增代次，弹出时丢弃过期条目。
+    """
+
+    def __init__(self, on_warning=None, on_expire=None, clock=time.monotonic_ns,
+                 scheduler=None):
+        self.on_warning = on_warning
+        self.on_expire = on_expire
+        self.clock = clock
+        self.scheduler = scheduler
+
+        self.sessions = {}
+        self._heap = []
+        self._seq = 0
+        self._armed_deadline = None
+        self._armed_event = None
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def add_session(self, session_id, time_limit, warning_threshold=0):
+        """添加会话"""
+        session = Session(session_id, time_limit, warning_threshold, self.clock)
+        self.sessions[session_id] = session
+        return session
+
+    def remove_session(self, session_id):
+        """删除会话"""
+        session = self.sessions.pop(session_id, None)
+        if session:
+            session.generation += 1
+
+    def start(self, session_id):
+        """开始或继续某个会话"""
+        session = self.sessions[session_id]
+        if session.running or session.expired:
+            return
+        session.account.open()
+        self._push(session)
+
+    def pause(self, session_id):
+        """暂停某个会话"""
+        session = self.sessions[session_id]
+        if not session.running:
+            return
+        session.account.close()
+        session.generation += 1
+
+    def set_limit(self, session_id, time_limit):
+        """修改某个会话的时间限制，已用时间不变"""
+        session = self.sessions[session_id]
+        account = session.account
+        account.set_limit(time_limit)
+        remaining_ns = account.remaining_ns()
+        if remaining_ns > session.warning_ns:
+            session.warning_fired = False
+        if session.expired and remaining_ns > 0:
+            # 放宽限制后恢复可用，由调用方决定是否继续计时
+            session.expired = False
+        if session.running:
+            # 按新的限制重新预约，已经超出时立即到期
+            self._push(session)
+        elif not session.expired and remaining_ns == 0:
+            session.generation += 1
+            session.expired = True
+            if self.on_expire:
+                self.on_expire(session)
+
+    def reset(self, session_id, time_limit=None):
+        """重置某个会话"""
+        session = self.sessions[session_id]
+        session.account.reset(time_limit)
+        session.warning_fired = False
+        session.expired = False
+        session.generation += 1
+
+    def next_deadline_ns(self):
+        """最早的有效截止时间，没有时返回None"""
+        heap = self._heap
+        sessions = self.sessions
+        while heap:
+            deadline, _, session_id, generation, _ = heap[0]
+            session = sessions.get(session_id)
+            if session is not None and session.generation == generation:
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    def advance(self, now_ns=None):
+        """处理所有已到期的截止时间，返回触发的事件数"""
+        if now_ns is None:
+            now_ns = self.clock()
+        heap = self._heap
+        sessions = self.sessions
+        fired = 0
+        while heap and heap[0][0] <= now_ns:
+            _, _, session_id, generation, kind = heapq.heappop(heap)
+            session = sessions.get(session_id)
+            if session is None or session.generation != generation:
+                continue
+            session.generation += 1
+            if kind == DEADLINE_WARNING:
+                session.warning_fired = True
+                fired += 1
+                if self.on_warning:
+                    self.on_warning(session)
+                self._push(session)
+            else:
+                session.account.close()
+                session.expired = True
+                fired += 1
+                if self.on_expire:
+                    self.on_expire(session)
+        if self.scheduler:
+            self._arm()
+        return fired
+
+    def _push(self, session):
+        """为运行中的会话压入下一个截止时间"""
+        session.generation += 1
+        remaining_ns = session.account.remaining_ns()
+        if not session.warning_fired and 0 < session.warning_ns < remaining_ns:
+            kind = DEADLINE_WARNING
+            delay_ns = remaining_ns - session.warning_ns
+        else:
+            kind = DEADLINE_EXPIRE
+            delay_ns = remaining_ns
+        self._seq += 1
+        deadline = self.clock() + delay_ns
+        heapq.heappush(self._heap, (deadline, self._seq, session.session_id,
+                                    session.generation, kind))
+        if self.scheduler and (self._armed_deadline is None or deadline < self._armed_deadline):
+            self._arm()
+
+    def _arm(self):
+        """只为最早的截止时间预约一次宿主回调"""
+        deadline = self.next_deadline_ns()
+        if deadline == self._armed_deadline:
+            return
+        if self._armed_event:
+            self._armed_event.cancel()
+            self._armed_event = None
+        self._armed_deadline = deadline
+        if deadline is not None:
+            delay = max(0, deadline - self.clock()) / NS_PER_SECOND
+            self._armed_event = self.scheduler.schedule_once(self._on_armed, delay)
+
+    def _on_armed(self, dt=None):
+        self._armed_event = None
+        self._armed_deadline = None
+        self.advance()
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+设置存储模块
+整个进程共用一个设置存储，只在启动时读取一次配置文件；
+修改通过 update() 保存并通知订阅者，界面无需重启即可生效
+"""
+
+import copy
+
+from config_file import ConfigWriter, read_config, read_file
+from config_schema import ConfigDocument
+
+
+class SettingsStore:
+    """进程内共享的设置存储
+
+    config 为当前方案的 LimiterConfig，各项已在读取时校验，直接读属性即可。
+    用 shared() 取得唯一实例，订阅者回调的参数为发生变化的键集合。
+    """
+
+    CONFIG_FILE = "limiter_config.json"
+
+    _shared = None
+
+    def __init__(self, config_file=None):
+        self.config_file = config_file or self.CONFIG_FILE
+        self.writer = ConfigWriter(self.config_file)
+        self.document = self.load_config()
+        self.config = self.document.current
+        self.subscribers = []
+
+    @classmethod
+    def shared(cls):
+        """进程内唯一的设置实例"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def load_config(self):
+        """读取配置文件，升级旧版本并校验，缺少的项用默认值补齐
+
+        结构无效的文件按损坏处理，从上一代备份恢复。
+        """
+        generation, document = read_config(
+            self.config_file,
+            parse=lambda stored: ConfigDocument.from_dict(stored, strict=True)
+        )
+        self.writer.generation = generation
+        return document or ConfigDocument()
+
+    def save_config(self):
+        """保存配置，实际写入在后台线程中进行"""
+        self.writer.save(self.document.to_dict())
+
+    def flush(self):
+        """等待尚未写入的配置落盘"""
+        return self.writer.flush()
+
+    def reload(self):
+        """配置文件被外部替换后重新读取，校验通过才应用，返回发生变化的键
+
+        外部文件无论是无法解析还是结构无效，都保持当前配置，不会抛出异常。
+        """
+        try:
+            generation, stored = read_file(self.config_file)
+            document = ConfigDocument.from_dict(stored, strict=True)
+        except FileNotFoundError:
+            return set()
+        except (OSError, ValueError) as e:
+            # ConfigCorrupted 和 ConfigInvalid 都是 ValueError
+            print(f"外部配置无效，保持当前配置: {e}")
+            return set()
+        if self.writer.wrote(stored) or document.to_dict() == self.document.to_dict():
+            # 自己写入的内容；后续的保存写完后还会再收到一次通知并重新检查
+            return set()
+        changed = self.config.diff(document.current)
+        self.document = document
+        self.config = document.current
+        self.writer.generation = max(generation, self.writer.generation)
+        print(f"已应用外部配置，变化: {', '.join(sorted(changed)) or '无'}")
+        if self.writer.busy:
+            # 还有自己的保存没写完，用外部配置替换它，避免旧内容覆盖刚推送的文件
+            self.save_config()
+        if changed:
+            self.notify(changed)
+        return changed
+
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+
+    def subscribe(self, callback):
+        """订阅设置变化"""
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def update(self, changes):
+        """修改当前方案的若干设置，保存并通知订阅者，返回发生变化的键"""
+        config = self.config.replace(changes)
+        if not self.config.diff(config):
+            return set()
+        return self._apply(config)
+
+    def profile_names(self):
+        return sorted(self.document.profiles)
+
+    def switch_profile(self, name):
+        """切换到指定方案，不存在时以当前方案为模板新建"""
+        document = self.document
+        if name not in document.profiles:
+            document.profiles[name] = self.config.replace(copy.deepcopy(self.config.to_dict()))
+        document.active_profile = name
+        return self._apply(document.profiles[name])
+
+    def _apply(self, config):
+        changed = self.config.diff(config)
+        self.document.profiles[self.document.active_profile] = config
+        self.config = config
+        # 切换方案时即使各项相同也要记录当前方案名
+        self.save_config()
+        if changed:
+            self.notify(changed)
+        return changed
+
+    def notify(self, changed):
+        for callback in list(self.subscribers):
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"应用设置变化失败: {e}")
\ No newline at end of file
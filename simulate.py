@@ -0,0 +1,130 @@
+"""
+快进模拟运行器
+用虚拟时钟驱动 MainScreen 所用的同一个 LimiterController（计时、警告、到时、配额、时段），
+按脚本跑完一整天的操作而不做任何真实等待，适合在CI中批量运行策略场景
+
+用法: python simulate.py [重复次数]
+"""
+
+import sys
+import time
+
+from time_source import VirtualClock, NS_PER_SECOND
+from config_schema import LimiterConfig
+from limiter_controller import LimiterController, OPEN_ALLOWED
+
+DAY_SECONDS = 24 * 3600
+
+
+class SimulatedApp:
+    """模拟场景中的应用"""
+
+    def __init__(self, name, category="其他", is_call_related=False):
+        self.name = name
+        self.category = category
+        self.is_call_related = is_call_related
+
+
+class HeadlessLimiter:
+    """不依赖Kivy界面的限时器，把 LimiterController 的回调和操作记入日志"""
+
+    def __init__(self, config, clock):
+        self.clock = clock
+        self.log = []
+        self.controller = LimiterController(
+            LimiterConfig(config),
+            clock,
+            clock,
+            on_warning=lambda: self.record("warning"),
+            on_expired=lambda: self.record("expired"),
+            on_quota_exhausted=lambda key: self.record("quota_exhausted", f"{key[0]}:{key[1]}")
+        )
+
+    def record(self, kind, detail=""):
+        """记录一条事件（秒, 类型, 说明）"""
+        self.log.append((self.clock.now_ns // NS_PER_SECOND, kind, detail))
+
+    def start(self):
+        if self.controller.start():
+            self.record("start")
+
+    def pause(self):
+        self.controller.pause()
+        self.record("pause")
+
+    def reset(self):
+        self.controller.reset()
+        self.record("reset")
+
+    def unlock(self):
+        self.controller.reset(unlock=True)
+        self.record("unlock")
+
+    def open_app(self, name, category="其他", is_call_related=False):
+        """打开应用，返回是否允许"""
+        app = SimulatedApp(name, category, is_call_related)
+        result = self.controller.open_app(app)
+        if result != OPEN_ALLOWED:
+            self.record("denied", f"{name}:{result}")
+            return False
+        self.record("open", name)
+        return True
+
+    def close_app(self):
+        foreground = self.controller.quota.foreground
+        if foreground is not None:
+            self.record("close", foreground.name)
+        self.controller.close_app()
+
+
+def run_scenario(config, script, duration=DAY_SECONDS, start_wall=None):
+    """运行一个场景
+
+    script: [(秒, 操作名, 参数...), ...]，操作名为 HeadlessLimiter 的方法名。
+    返回事件日志。
+    """
+    clock = VirtualClock(start_wall)
+    limiter = HeadlessLimiter(config, clock)
+    for at, action, *args in sorted(script, key=lambda step: step[0]):
+        clock.advance(at - clock.now_ns / NS_PER_SECOND)
+        getattr(limiter, action)(*args)
+    clock.advance(duration - clock.now_ns / NS_PER_SECOND)
+    return limiter.log
+
+
+SAMPLE_CONFIG = {
+    "time_limit_minutes": 30,
+    "warning_minutes": 5,
+    "category_limits": {"娱乐": 20, "社交": 15},
+    "schedule_rules": [
+        {"days": [0, 1, 2, 3, 4], "start": "08:00", "end": "16:00"},
+        {"start": "21:30", "end": "07:00"},
+    ],
+}
+
+SAMPLE_SCRIPT = [
+    (7 * 3600, "start"),
+    (7 * 3600 + 60, "open_app", "游戏中心", "娱乐"),
+    (7 * 3600 + 25 * 60, "close_app"),
+    (9 * 3600, "open_app", "微信", "社交"),
+    (17 * 3600, "open_app", "微信", "社交"),
+    (17 * 3600 + 10 * 60, "open_app", "游戏中心", "娱乐"),
+    (17 * 3600 + 11 * 60, "open_app", "电话", "通讯", True),
+    (18 * 3600, "unlock"),
+    (22 * 3600, "open_app", "视频", "媒体"),
+]
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    # 从某个星期一的零点开始
+    monday = time.mktime((2026, 10, 19, 0, 0, 0, 0, 0, -1))
+
+    for at, kind, detail in run_scenario(SAMPLE_CONFIG, SAMPLE_SCRIPT, start_wall=monday):
+        print(f"{at // 3600:02d}:{at // 60 % 60:02d}:{at % 60:02d}  {kind:16s} {detail}")
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        run_scenario(SAMPLE_CONFIG, SAMPLE_SCRIPT, start_wall=monday)
+    elapsed = time.perf_counter() - t0
+    print(f"\n{repeat} 个场景耗时 {elapsed:.2f}s，平均每个 {elapsed / repeat * 1000:.2f}ms")
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+启动耗时追踪模块
+按阶段记录从导入本模块到首帧绘制完成的耗时，启动完成后打印一次报告。
+主程序应尽早导入本模块，让模块导入时间也计入统计
+"""
+
+import time
+
+
+class StartupTrace:
+    """启动阶段耗时记录"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.origin = clock()
+        self.last = self.origin
+        self.phases = []
+        self.first_frame = None
+
+    def mark(self, phase):
+        """结束一个阶段，记录它距上一个阶段的耗时"""
+        now = self.clock()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def watch_first_frame(self, window):
+        """在窗口第一次绘制完成时记录首帧耗时并打印报告"""
+        def on_draw(*args):
+            window.unbind(on_draw=on_draw)
+            self.mark("首帧绘制")
+            self.first_frame = self.last - self.origin
+            print(self.format_report())
+
+        window.bind(on_draw=on_draw)
+
+    def format_report(self):
+        """启动报告文本"""
+        lines = ["启动耗时:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase}: {seconds * 1000:.1f}ms")
+        if self.first_frame is not None:
+            lines.append(f"  首帧总计: {self.first_frame * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+TRACE = StartupTrace()
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+主界面状态渲染模块
+记录每个标签属性上一次写入的值，只在值变化时赋值，
+避免每秒无变化的赋值触发 Kivy 重新排版和重绘文字纹理
+"""
+
+import time
+
+BAR_LENGTH = 20
+
+# 21 种进度条文字，下标为已填充的格数
+PROGRESS_BARS = tuple("█" * filled + "░" * (BAR_LENGTH - filled) for filled in range(BAR_LENGTH + 1))
+
+# 进度条颜色
+COLOR_GREEN = (0.2, 0.8, 0.2, 1)
+COLOR_YELLOW = (0.9, 0.7, 0.2, 1)
+COLOR_RED = (0.9, 0.2, 0.2, 1)
+
+# 状态
+STATUS_IDLE = 0
+STATUS_RUNNING = 1
+STATUS_LOCKED = 2
+
+STATUS_COLORS = {
+    STATUS_IDLE: (0.2, 0.2, 0.2, 1),
+    STATUS_RUNNING: (0.2, 0.7, 0.2, 1),
+    STATUS_LOCKED: (0.9, 0.2, 0.2, 1),
+}
+
+DEFAULT_STATUS_TEXTS = {
+    STATUS_IDLE: "手机使用时间限制器",
+    STATUS_RUNNING: "计时中...",
+    STATUS_LOCKED: "限制模式 - 仅通话功能",
+}
+
+
+def progress_state(remaining, time_limit):
+    """返回 (进度条文字, 颜色)"""
+    progress = remaining / time_limit
+    filled = min(BAR_LENGTH, max(0, int(progress * BAR_LENGTH)))
+    if progress > 0.5:
+        color = COLOR_GREEN
+    elif progress > 0.2:
+        color = COLOR_YELLOW
+    else:
+        color = COLOR_RED
+    return PROGRESS_BARS[filled], color
+
+
+class StatusRenderer:
+    """倒计时、进度条和状态标签的渲染层
+
+    每次 render() 只写入与上次不同的属性，并统计跳过的写入次数。
+    """
+
+    def __init__(self, time_label, progress_label, status_label,
+                 status_texts=None, clock=time.monotonic):
+        self.time_label = time_label
+        self.progress_label = progress_label
+        self.status_label = status_label
+        self.status_texts = status_texts or DEFAULT_STATUS_TEXTS
+        self.clock = clock
+        self.started = clock()
+        self.last = {}
+        self.writes = 0
+        self.skipped = 0
+        self._last_seconds = None
+
+    def render(self, remaining, time_limit, time_up, running):
+        # 倒计时文字按整秒缓存，同一秒内不重新格式化
+        seconds = int(remaining)
+        if seconds != self._last_seconds:
+            self._last_seconds = seconds
+            self._time_text = f"剩余时间: {seconds // 60:02d}:{seconds % 60:02d}"
+        self._set(self.time_label, "text", self._time_text)
+
+        if time_limit > 0:
+            bar, color = progress_state(remaining, time_limit)
+            self._set(self.progress_label, "text", bar)
+            self._set(self.progress_label, "color", color)
+
+        if time_up:
+            status = STATUS_LOCKED
+        elif running:
+            status = STATUS_RUNNING
+        else:
+            status = STATUS_IDLE
+        self._set(self.status_label, "text", self.status_texts[status])
+        self._set(self.status_label, "color", STATUS_COLORS[status])
+
+    def _set(self, label, attr, value):
+        key = (id(label), attr)
+        if self.last.get(key) is value:
+            self.skipped += 1
+            return
+        self.last[key] = value
+        setattr(label, attr, value)
+        self.writes += 1
+
+    def invalidate(self):
+        """标签被外部修改后调用，下次 render() 全部重新写入"""
+        self.last.clear()
+
+    def skipped_per_minute(self):
+        """平均每分钟避免的重绘次数"""
+        minutes = (self.clock() - self.started) / 60
+        return self.skipped / minutes if minutes > 0 else 0.0
+
+    def format_summary(self):
+        """调试面板显示的文本"""
+        return (f"标签写入: {self.writes} 次，跳过 {self.skipped} 次"
+                f"（约 {self.skipped_per_minute():.0f} 次/分钟）")
\ No newline at end of file
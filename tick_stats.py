@@ -0,0 +1,150 @@
+"""
+定时回调抖动统计模块（调试用，默认关闭）
+记录 Clock 回调的延迟、执行耗时和累计漂移，保存在定长环形缓冲区中，
+可通过 summary() 或设置页面的隐藏调试面板查看 p50/p95/p99
+"""
+
+import os
+import time
+from array import array
+
+ENV_FLAG = "LIMITER_TICK_STATS"
+
+_active_stats = None
+
+
+class RingBuffer:
+    """定长浮点环形缓冲区，写入不分配内存"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = array('d', bytes(8 * capacity))
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self):
+        """按写入顺序返回当前保存的值"""
+        if self.count < self.capacity:
+            return list(self.data[:self.count])
+        return list(self.data[self.index:]) + list(self.data[:self.index])
+
+    def percentile(self, fraction):
+        """最近样本的百分位数，没有样本时返回None"""
+        if not self.count:
+            return None
+        ordered = sorted(self.data[:self.count])
+        position = min(self.count - 1, int(round(fraction * (self.count - 1))))
+        return ordered[position]
+
+
+class TickStats:
+    """回调延迟、执行耗时和累计漂移（单位：秒）"""
+
+    def __init__(self, capacity=1024):
+        self.lateness = RingBuffer(capacity)
+        self.execution = RingBuffer(capacity)
+        self.drift = RingBuffer(capacity)
+        self.callbacks = 0
+
+    def record(self, lateness, execution, drift=None):
+        self.callbacks += 1
+        self.lateness.append(lateness)
+        self.execution.append(execution)
+        if drift is not None:
+            self.drift.append(drift)
+
+    def summary(self):
+        """各项指标的 p50/p95/p99（毫秒）"""
+        result = {"callbacks": self.callbacks}
+        for name in ("lateness", "execution", "drift"):
+            buffer = getattr(self, name)
+            result[name] = {
+                label: None if value is None else value * 1000
+                for label, value in (
+                    ("p50", buffer.percentile(0.50)),
+                    ("p95", buffer.percentile(0.95)),
+                    ("p99", buffer.percentile(0.99)),
+                )
+            }
+        return result
+
+    def format_summary(self):
+        """调试面板显示的文本"""
+        summary = self.summary()
+        names = {"lateness": "回调延迟", "execution": "执行耗时", "drift": "累计漂移"}
+        lines = [f"回调次数: {summary['callbacks']}"]
+        for key, title in names.items():
+            values = summary[key]
+            if values["p50"] is None:
+                lines.append(f"{title}: 无数据")
+            else:
+                lines.append(
+                    f"{title}: p50 {values['p50']:.1f}ms  "
+                    f"p95 {values['p95']:.1f}ms  p99 {values['p99']:.1f}ms"
+                )
+        return "\n".join(lines)
+
+
+class InstrumentedScheduler:
+    """包装调度器，测量每个回调相对预期时间的延迟和执行耗时"""
+
+    def __init__(self, inner, stats, clock=time.monotonic):
+        self.inner = inner
+        self.stats = stats
+        self.clock = clock
+
+    def schedule_once(self, callback, delay):
+        due = self.clock() + delay
+
+        def wrapped(dt):
+            return self._run(callback, dt, due)
+
+        return self.inner.schedule_once(wrapped, delay)
+
+    def schedule_interval(self, callback, interval):
+        # 延迟相对上一次实际触发计算；漂移相对理想时间 基准 + n*间隔 累计
+        origin = self.clock()
+        state = {"last": origin, "ticks": 0}
+
+        def wrapped(dt):
+            now = self.clock()
+            state["ticks"] += 1
+            due = state["last"] + interval
+            drift = now - (origin + state["ticks"] * interval)
+            state["last"] = now
+            return self._run(callback, dt, due, drift)
+
+        return self.inner.schedule_interval(wrapped, interval)
+
+    def _run(self, callback, dt, due, drift=None):
+        start = self.clock()
+        result = callback(dt)
+        end = self.clock()
+        self.stats.record(max(0.0, start - due), end - start, drift)
+        return result
+
+
+def is_enabled(config=None):
+    """是否开启统计：环境变量或配置项 debug_tick_stats"""
+    if os.environ.get(ENV_FLAG):
+        return True
+    return bool(config and config.get("debug_tick_stats"))
+
+
+def enable(capacity=1024):
+    """开启统计并返回全局的 TickStats"""
+    global _active_stats
+    if _active_stats is None:
+        _active_stats = TickStats(capacity)
+    return _active_stats
+
+
+def active_stats():
+    """当前的 TickStats，未开启时返回None"""
+    return _active_stats
\ No newline at end of file
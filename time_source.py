@@ -0,0 +1,243 @@
+"""
+时间源模块
+计时引擎、配额、时段规则和弹窗统一从这里取时间，
+测试和模拟时可以换成可快进的虚拟时钟
+"""
+
+import functools
+import heapq
+import json
+import time
+
+from config_file import write_atomic
+
+NS_PER_SECOND = 1000000000
+
+# 休眠期间是否计入使用时间
+SUSPEND_NOT_COUNTED = "not_counted"
+SUSPEND_COUNTED = "counted"
+
+# Linux/Android 上 CLOCK_BOOTTIME 包含休眠时间，CLOCK_MONOTONIC 不包含
+BOOTTIME_AVAILABLE = hasattr(time, "CLOCK_BOOTTIME")
+
+# 每次开机不同的标识，以及保存墙上时间锚点的文件
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+CLOCK_ANCHOR_FILE = "limiter_clock.json"
+
+
+class SystemClock:
+    """真实系统时钟"""
+
+    def monotonic_ns(self):
+        """单调时间（纳秒），用于计算时长"""
+        return time.monotonic_ns()
+
+    def time(self):
+        """墙上时间（秒），用于判断日期和时段"""
+        return time.time()
+
+    def time_ns(self):
+        """墙上时间（纳秒）"""
+        return time.time_ns()
+
+    def check_wall_jump(self):
+        """系统时钟直接使用墙上时间，不检测跳变"""
+        return 0
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+def _boottime_ns():
+    if BOOTTIME_AVAILABLE:
+        return time.clock_gettime_ns(time.CLOCK_BOOTTIME)
+    return time.monotonic_ns()
+
+
+def boot_id():
+    """本次开机的标识，读不到时返回None"""
+    try:
+        with open(BOOT_ID_PATH, 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class TrustedClock:
+    """抗休眠和系统时间修改的时间源
+
+    计时只使用单调时钟，修改系统时间不会改变已用时间；
+    墙上时间由启动时缓存的偏移量加上 CLOCK_BOOTTIME 推算，热路径上只有一次时钟读取。
+    check_wall_jump() 比较推算值和系统时间，发现跳变时按 trust_wall_changes 决定是否采纳。
+    给出 anchor_path 时把 (开机标识, CLOCK_BOOTTIME, 墙上时间) 写入锚点文件，
+    同一次开机内重启应用沿用原来的偏移量，期间修改系统时间不能让日期前进。
+    """
+
+    def __init__(self, suspend_policy=SUSPEND_NOT_COUNTED, jump_tolerance=2.0,
+                 trust_wall_changes=False, on_wall_jump=None, anchor_path=None,
+                 boot_id=boot_id):
+        self.suspend_policy = suspend_policy
+        self.jump_tolerance_ns = int(jump_tolerance * NS_PER_SECOND)
+        self.trust_wall_changes = trust_wall_changes
+        self.on_wall_jump = on_wall_jump
+        self.wall_jumps = 0
+
+        # 计时用的时钟在初始化时选定，调用时不再判断
+        if suspend_policy == SUSPEND_COUNTED:
+            self.monotonic_ns = _boottime_ns if BOOTTIME_AVAILABLE else time.monotonic_ns
+        else:
+            self.monotonic_ns = time.monotonic_ns
+        self._boot_ns = (functools.partial(time.clock_gettime_ns, time.CLOCK_BOOTTIME)
+                         if BOOTTIME_AVAILABLE else time.monotonic_ns)
+
+        self._mono_origin = time.monotonic_ns()
+        self._boot_origin = self._boot_ns()
+        self._wall_offset_ns = time.time_ns() - self._boot_origin
+        # 未采纳的跳变累计值，同一次跳变只报告一次
+        self._rejected_ns = 0
+
+        self.anchor_path = anchor_path
+        self.boot_id = boot_id() if anchor_path else None
+        if anchor_path:
+            self._load_anchor()
+
+    def _load_anchor(self):
+        """同一次开机时沿用锚点的偏移量，否则以当前系统时间建立新锚点
+
+        换了开机或读不到开机标识时无法判断期间经过了多久，只能采用系统时间。
+        """
+        try:
+            with open(self.anchor_path, 'r', encoding='utf-8') as f:
+                anchor = json.load(f)
+            if self.boot_id and anchor.get("boot_id") == self.boot_id:
+                boot_ns = int(anchor["boot_ns"])
+                wall_ns = int(anchor["wall_ns"])
+                if 0 <= boot_ns <= self._boot_origin:
+                    self._wall_offset_ns = wall_ns - boot_ns
+                    return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"读取时钟锚点失败: {e}")
+        self._save_anchor()
+
+    def _save_anchor(self):
+        if not self.anchor_path or not self.boot_id:
+            return
+        boot_ns = self._boot_ns()
+        anchor = {"boot_id": self.boot_id, "boot_ns": boot_ns,
+                  "wall_ns": boot_ns + self._wall_offset_ns}
+        try:
+            write_atomic(self.anchor_path, json.dumps(anchor).encode('utf-8'), keep_backup=False)
+        except OSError as e:
+            print(f"保存时钟锚点失败: {e}")
+
+    def time_ns(self):
+        """推算的墙上时间（纳秒）"""
+        return self._boot_ns() + self._wall_offset_ns
+
+    def time(self):
+        """推算的墙上时间（秒）"""
+        return self.time_ns() / NS_PER_SECOND
+
+    def suspended_ns(self):
+        """创建以来设备休眠的总时长，不支持 CLOCK_BOOTTIME 时为0"""
+        return max(0, (self._boot_ns() - self._boot_origin)
+                   - (time.monotonic_ns() - self._mono_origin))
+
+    def check_wall_jump(self):
+        """检查系统时间是否被修改，返回跳变的秒数（未跳变返回0）
+
+        只在恢复前台、时段切换等低频时机调用。
+        """
+        delta = time.time_ns() - self.time_ns() - self._rejected_ns
+        if abs(delta) <= self.jump_tolerance_ns:
+            return 0
+        self.wall_jumps += 1
+        if self.trust_wall_changes:
+            self._wall_offset_ns += delta
+            self._save_anchor()
+        else:
+            self._rejected_ns += delta
+        if self.on_wall_jump:
+            self.on_wall_jump(delta / NS_PER_SECOND)
+        return delta / NS_PER_SECOND
+
+
+class _VirtualEvent:
+    """虚拟时钟上的预约事件"""
+
+    def __init__(self, callback, interval, repeat):
+        self.callback = callback
+        self.interval = interval
+        self.repeat = repeat
+        self.cancelled = False
+
+    def cancel(self):
+        """取消事件"""
+        self.cancelled = True
+
+
+class VirtualClock:
+    """可快进的虚拟时钟，同时充当调度器
+
+    advance() 按时间顺序触发期间到期的回调，不做任何真实等待，
+    一整天的场景可以在几毫秒内跑完。
+    """
+
+    def __init__(self, start_wall=None):
+        self.now_ns = 0
+        self.start_wall = time.time() if start_wall is None else start_wall
+        self._queue = []
+        self._seq = 0
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def time(self):
+        return self.start_wall + self.now_ns / NS_PER_SECOND
+
+    def time_ns(self):
+        return int(self.start_wall * NS_PER_SECOND) + self.now_ns
+
+    def check_wall_jump(self):
+        return 0
+
+    def schedule_once(self, callback, delay):
+        """延迟执行一次"""
+        event = _VirtualEvent(callback, delay, repeat=False)
+        self._push(event, delay)
+        return event
+
+    def schedule_interval(self, callback, interval):
+        """按固定间隔重复执行"""
+        event = _VirtualEvent(callback, interval, repeat=True)
+        self._push(event, interval)
+        return event
+
+    def advance(self, seconds):
+        """快进指定秒数，返回触发的回调数"""
+        target = self.now_ns + int(seconds * NS_PER_SECOND)
+        fired = 0
+        queue = self._queue
+        while queue and queue[0][0] <= target:
+            due, _, event = heapq.heappop(queue)
+            if event.cancelled:
+                continue
+            self.now_ns = max(self.now_ns, due)
+            fired += 1
+            event.callback(event.interval)
+            if event.repeat and not event.cancelled:
+                self._push(event, event.interval)
+        self.now_ns = target
+        return fired
+
+    def pending(self):
+        """尚未触发的事件数"""
+        return sum(1 for _, _, event in self._queue if not event.cancelled)
+
+    def _push(self, event, delay):
+        self._seq += 1
+        # 间隔至少1纳秒，避免0间隔的重复事件死循环
+        due = self.now_ns + max(1, int(delay * NS_PER_SECOND))
+        heapq.heappush(self._queue, (due, self._seq, event))
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""
+计时引擎模块
+按截止时间调度的无界面计时器，替代每秒轮询的 update_ui
+"""
+
+import threading
+
+from usage_account import UsageAccount
+from time_source import SYSTEM_CLOCK
+from session_journal import (
+    EVENT_START, EVENT_PAUSE, EVENT_RESET, EVENT_UNLOCK, EVENT_EXPIRE, EVENT_WARNING
+)
+
+try:
+    from kivy.clock import Clock
+    KIVY_AVAILABLE = True
+except ImportError:
+    KIVY_AVAILABLE = False
+
+
+class KivyScheduler:
+    """基于Kivy Clock的调度器"""
+
+    def schedule_once(self, callback, delay):
+        """延迟执行一次"""
+        return Clock.schedule_once(callback, delay)
+
+    def schedule_interval(self, callback, interval):
+        """按固定间隔重复执行"""
+        return Clock.schedule_interval(callback, interval)
+
+
+class _ThreadEvent:
+    """线程调度器返回的事件句柄"""
+
+    def __init__(self, callback, delay, repeat):
+        self.callback = callback
+        self.delay = delay
+        self.repeat = repeat
+        self.cancelled = False
+        self.timer = None
+        self._arm()
+
+    def _arm(self):
+        self.timer = threading.Timer(self.delay, self._fire)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _fire(self):
+        if self.cancelled:
+            return
+        self.callback(self.delay)
+        if self.repeat and not self.cancelled:
+            self._arm()
+
+    def cancel(self):
+        """取消事件"""
+        self.cancelled = True
+        if self.timer:
+            self.timer.cancel()
+
+
+class ThreadScheduler:
+    """无Kivy环境下的调度器，使用 threading.Timer"""
+
+    def schedule_once(self, callback, delay):
+        """延迟执行一次"""
+        return _ThreadEvent(callback, delay, repeat=False)
+
+    def schedule_interval(self, callback, interval):
+        """按固定间隔重复执行"""
+        return _ThreadEvent(callback, interval, repeat=True)
+
+
+def default_scheduler():
+    """根据运行环境选择调度器"""
+    if KIVY_AVAILABLE:
+        return KivyScheduler()
+    return ThreadScheduler()
+
+
+class TimerEngine:
+    """截止时间驱动的计时引擎
+
+    只为下一个关键事件（警告阈值或时间用完）预约一次回调，
+    倒计时显示按独立的刷新间隔更新，刷新间隔为0时停止刷新。
+    """
+
+    def __init__(self, time_limit, warning_threshold, on_warning=None,
+                 on_expire=None, on_tick=None, tick_interval=1.0, scheduler=None,
+                 journal=None, clock=None, ledger=None):
+        self.time_limit = time_limit
+        self.warning_threshold = warning_threshold
+        self.on_warning = on_warning
+        self.on_expire = on_expire
+        self.on_tick = on_tick
+        self.tick_interval = tick_interval
+        self.scheduler = scheduler or default_scheduler()
+        self.journal = journal
+        self.clock = clock or SYSTEM_CLOCK
+        self.ledger = ledger
+
+        self.account = UsageAccount(time_limit, self.clock.monotonic_ns)
+        self.warning_fired = False
+        self.expired = False
+
+        self._deadline_event = None
+        self._tick_event = None
+
+    @property
+    def running(self):
+        """是否正在计时"""
+        return self.account.running
+
+    def elapsed(self):
+        """已使用的秒数"""
+        return self.account.elapsed()
+
+    def remaining(self):
+        """剩余秒数"""
+        return self.account.remaining()
+
+    def start(self):
+        """开始或继续计时"""
+        if self.running or self.expired:
+            return
+        self.account.open()
+        self._record(EVENT_START)
+        self._arm_deadline()
+        self._arm_tick()
+        self._notify_tick()
+
+    def pause(self):
+        """暂停计时"""
+        if not self.running:
+            return
+        self.account.close()
+        self._record(EVENT_PAUSE)
+        self._cancel_events()
+        self._notify_tick()
+
+    def reset(self, time_limit=None, warning_threshold=None, event=EVENT_RESET):
+        """重置计时器，可同时更新时间限制和警告阈值"""
+        self._cancel_events()
+        if time_limit is not None:
+            self.time_limit = time_limit
+        if warning_threshold is not None:
+            self.warning_threshold = warning_threshold
+        self.account.reset(self.time_limit)
+        self.warning_fired = False
+        self.expired = False
+        self._record(event)
+        self._notify_tick()
+
+    def configure(self, time_limit, warning_threshold):
+        """运行中修改时间限制和警告阈值，已用时间不变
+
+        已到时的状态保持不变，仍需解锁。
+        """
+        self.time_limit = time_limit
+        self.warning_threshold = warning_threshold
+        self.account.set_limit(time_limit)
+        if self.account.remaining() > warning_threshold:
+            self.warning_fired = False
+        if self.running:
+            self._arm_deadline()
+        self._notify_tick()
+
+    def unlock(self, time_limit=None):
+        """输入管理密码解除限制"""
+        self.reset(time_limit, event=EVENT_UNLOCK)
+
+    def restore(self):
+        """从会话日志恢复已用时间和警告/到时状态
+
+        返回上次退出时是否仍在计时，由界面决定是否继续。
+        """
+        if not self.journal:
+            return False
+        state = self.journal.state
+        self.account.restore(state.used_at_recovery(self.clock.time_ns()))
+        self.warning_fired = state.warned
+        self.expired = state.expired or self.account.remaining_ns() == 0
+        if self.expired and not state.expired:
+            # 进程在计时期间被终止且时间已耗尽
+            self._record(EVENT_EXPIRE)
+        return state.running and not self.expired
+
+    def set_tick_interval(self, interval):
+        """修改倒计时刷新间隔，0表示停止刷新（如屏幕关闭时）"""
+        self.tick_interval = interval
+        if self._tick_event:
+            self._tick_event.cancel()
+            self._tick_event = None
+        if self.running:
+            self._arm_tick()
+            self._notify_tick()
+
+    def next_deadline(self):
+        """距离下一个关键事件的秒数，未运行时返回None
+
+        开始时已在警告区间内（如恢复或继续时接近时限）返回0，立即发出警告。
+        """
+        if not self.running:
+            return None
+        remaining = self.remaining()
+        if not self.warning_fired:
+            return max(0, remaining - self.warning_threshold)
+        return remaining
+
+    def _arm_deadline(self):
+        """为下一个截止时间预约回调"""
+        if self._deadline_event:
+            self._deadline_event.cancel()
+            self._deadline_event = None
+        delay = self.next_deadline()
+        if delay is not None:
+            self._deadline_event = self.scheduler.schedule_once(self._on_deadline, delay)
+
+    def _arm_tick(self):
+        """预约倒计时刷新"""
+        if self.on_tick and self.tick_interval > 0 and not self._tick_event:
+            self._tick_event = self.scheduler.schedule_interval(self._notify_tick, self.tick_interval)
+
+    def _cancel_events(self):
+        if self._deadline_event:
+            self._deadline_event.cancel()
+            self._deadline_event = None
+        if self._tick_event:
+            self._tick_event.cancel()
+            self._tick_event = None
+
+    def _on_deadline(self, dt=None):
+        """截止时间到达"""
+        self._deadline_event = None
+        if not self.running:
+            return
+        remaining = self.remaining()
+
+        if not self.warning_fired and remaining <= self.warning_threshold:
+            self.warning_fired = True
+            self._record(EVENT_WARNING)
+            if self.on_warning:
+                self.on_warning()
+
+        if remaining <= 0:
+            self.account.close()
+            self.expired = True
+            self._record(EVENT_EXPIRE)
+            self._cancel_events()
+            if self.on_expire:
+                self.on_expire()
+            self._notify_tick()
+            return
+
+        # 回调可能提前触发，重新预约剩余部分
+        self._arm_deadline()
+
+    def _record(self, event):
+        if self.journal:
+            self.journal.append(event, int(self.time_limit), self.account.used_ns(),
+                                self.clock.time_ns())
+        if self.ledger:
+            self.ledger.append(event, self.account.elapsed(), wall=self.clock.time())
+
+    def _notify_tick(self, dt=None):
+        if self.on_tick:
+            self.on_tick(self.remaining())
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+使用时间记账模块
+以整数纳秒记录运行片段，暂停/继续不会重置已用时间
+"""
+
+import time
+
+NS_PER_SECOND = 1000000000
+
+
+class UsageAccount:
+    """使用时间账户
+
+    已结束的运行片段保存在 segments 中，当前片段只记录开始时间。
+    closed_ns 是已结束片段的累计时长，因此 remaining() 为 O(1)。
+    """
+
+    def __init__(self, limit_seconds, clock=time.monotonic_ns):
+        self.clock = clock
+        self.limit_ns = int(limit_seconds * NS_PER_SECOND)
+        self.segments = []
+        self.closed_ns = 0
+        self.open_start = None
+
+    @property
+    def running(self):
+        """是否有未结束的片段"""
+        return self.open_start is not None
+
+    def open(self):
+        """开始一个新片段"""
+        if self.open_start is None:
+            self.open_start = self.clock()
+
+    def close(self):
+        """结束当前片段"""
+        if self.open_start is None:
+            return
+        end = self.clock()
+        self.segments.append((self.open_start, end))
+        self.closed_ns += end - self.open_start
+        self.open_start = None
+
+    def used_ns(self):
+        """已使用的纳秒数"""
+        if self.open_start is None:
+            return self.closed_ns
+        return self.closed_ns + (self.clock() - self.open_start)
+
+    def remaining_ns(self):
+        """剩余纳秒数"""
+        remaining = self.limit_ns - self.used_ns()
+        return remaining if remaining > 0 else 0
+
+    def remaining(self):
+        """剩余秒数"""
+        return self.remaining_ns() / NS_PER_SECOND
+
+    def elapsed(self):
+        """已使用的秒数"""
+        return self.used_ns() / NS_PER_SECOND
+
+    def restore(self, used_ns):
+        """从持久化的已用时间恢复，不保留片段明细"""
+        self.segments = []
+        self.closed_ns = min(int(used_ns), self.limit_ns)
+        self.open_start = None
+
+    def set_limit(self, limit_seconds):
+        """修改时间限制，保留已使用的时间"""
+        self.limit_ns = int(limit_seconds * NS_PER_SECOND)
+
+    def reset(self, limit_seconds=None):
+        """清空所有片段，可同时修改时间限制"""
+        if limit_seconds is not None:
+            self.limit_ns = int(limit_seconds * NS_PER_SECOND)
+        self.segments = []
+        self.closed_ns = 0
+        self.open_start = None
\ No newline at end of file
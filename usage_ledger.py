@@ -0,0 +1,207 @@
+"""
+使用记录模块
+打开应用、开始/暂停/重置计时、时间用完和密码解锁各记一条12字节的定长记录，
+按月分段追加写入，供使用统计和报告读取；读取时用 mmap 直接解包，不解析JSON
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import Counter
+
+from session_journal import (
+    EVENT_START, EVENT_PAUSE, EVENT_RESET, EVENT_UNLOCK, EVENT_EXPIRE, EVENT_WARNING
+)
+
+# 计时事件沿用会话日志的编号
+EVENT_OPEN_APP = 8
+
+EVENT_NAMES = {
+    EVENT_START: "开始计时",
+    EVENT_PAUSE: "暂停计时",
+    EVENT_RESET: "重置计时",
+    EVENT_UNLOCK: "密码解锁",
+    EVENT_EXPIRE: "时间用完",
+    EVENT_WARNING: "时间警告",
+    EVENT_OPEN_APP: "打开应用",
+}
+
+# 墙上时间(秒), 事件类型, 应用编号(0表示无), 当时已用秒数
+RECORD = struct.Struct('<IBxHI')
+
+DEFAULT_DIR = "usage_ledger"
+APP_NAMES_FILE = "apps.txt"
+SEGMENT_PREFIX = "usage-"
+SEGMENT_SUFFIX = ".bin"
+
+
+def segment_key(wall):
+    """记录所属的分段，按UTC月份划分，如 202610"""
+    t = time.gmtime(wall)
+    return t.tm_year * 100 + t.tm_mon
+
+
+def segment_path(directory, key):
+    return os.path.join(directory, f"{SEGMENT_PREFIX}{key}{SEGMENT_SUFFIX}")
+
+
+def list_segments(directory):
+    """返回 [(分段, 路径)]，按时间排序"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    segments = []
+    for name in names:
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+            key = name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+            if key.isdigit():
+                segments.append((int(key), os.path.join(directory, name)))
+    return sorted(segments)
+
+
+def iter_segment(path):
+    """用 mmap 遍历一个分段中的记录，末尾不完整的记录忽略"""
+    size = RECORD.size
+    with open(path, 'rb') as f:
+        length = os.fstat(f.fileno()).st_size
+        if length < size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for offset in range(0, length - length % size, size):
+                yield RECORD.unpack_from(data, offset)
+
+
+def iter_events(directory=DEFAULT_DIR, start=None, end=None):
+    """遍历 [start, end) 墙上时间范围内的记录 (时间, 事件, 应用编号, 已用秒数)"""
+    first = segment_key(start) if start is not None else None
+    last = segment_key(end) if end is not None else None
+    for key, path in list_segments(directory):
+        if (first is not None and key < first) or (last is not None and key > last):
+            continue
+        for record in iter_segment(path):
+            wall = record[0]
+            if (start is None or wall >= start) and (end is None or wall < end):
+                yield record
+
+
+def load_app_names(directory=DEFAULT_DIR):
+    """应用名表，下标即应用编号，0号保留"""
+    names = [""]
+    try:
+        with open(os.path.join(directory, APP_NAMES_FILE), 'r', encoding='utf-8') as f:
+            names.extend(line.rstrip('\n') for line in f)
+    except FileNotFoundError:
+        pass
+    return names
+
+
+class UsageLedger:
+    """缓冲写入的使用记录
+
+    append() 只写内存缓冲区；有缓冲数据时预约一次 flush_interval 秒后的写盘，
+    空闲时不占用定时器。进入后台或退出时调用 flush(sync=True)。
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, flush_interval=60.0, max_buffered=256,
+                 scheduler=None, clock=time.time):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.scheduler = scheduler
+        self.clock = clock
+        self.app_names = load_app_names(directory)
+        self.app_ids = {name: index for index, name in enumerate(self.app_names) if index}
+        self.records_written = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_event = None
+        # 已检查过末尾对齐的分段
+        self._checked = set()
+
+    def app_id(self, name):
+        """应用编号，新应用追加到名表"""
+        if not name:
+            return 0
+        index = self.app_ids.get(name)
+        if index is None:
+            index = len(self.app_names)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(os.path.join(self.directory, APP_NAMES_FILE), 'a', encoding='utf-8') as f:
+                    f.write(name.replace('\n', ' ') + '\n')
+            except OSError as e:
+                print(f"写入应用名表失败: {e}")
+                return 0
+            self.app_names.append(name)
+            self.app_ids[name] = index
+        return index
+
+    def append(self, event, used_seconds=0, app=None, wall=None):
+        """记录一条事件"""
+        if wall is None:
+            wall = self.clock()
+        record = (int(wall), event, self.app_id(app), max(0, int(used_seconds)))
+        with self._lock:
+            self._buffer.append(record)
+            pending = len(self._buffer)
+        if pending >= self.max_buffered:
+            self.flush()
+        elif self._flush_event is None and self.scheduler:
+            self._flush_event = self.scheduler.schedule_once(self._on_flush_timer,
+                                                             self.flush_interval)
+
+    def _on_flush_timer(self, dt):
+        self._flush_event = None
+        self.flush()
+
+    def flush(self, sync=False):
+        """把缓冲的记录追加到对应分段，sync 为真时同时 fsync"""
+        if self._flush_event:
+            self._flush_event.cancel()
+            self._flush_event = None
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return 0
+
+        segments = {}
+        for record in records:
+            segments.setdefault(segment_key(record[0]), bytearray()).extend(RECORD.pack(*record))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for key, data in segments.items():
+                with open(segment_path(self.directory, key), 'ab') as f:
+                    self._align(key, f)
+                    f.write(data)
+                    f.flush()
+                    if sync:
+                        os.fsync(f.fileno())
+        except OSError as e:
+            print(f"写入使用记录失败: {e}")
+            return 0
+        self.records_written += len(records)
+        return len(records)
+
+    def _align(self, key, f):
+        """上次写到一半被中断时截掉不完整的记录，保持定长对齐"""
+        if key in self._checked:
+            return
+        size = f.seek(0, os.SEEK_END)
+        if size % RECORD.size:
+            f.truncate(size - size % RECORD.size)
+        self._checked.add(key)
+
+    def events(self, start=None, end=None):
+        """遍历记录 (时间, 事件, 应用名, 已用秒数)，包含尚未写盘的部分"""
+        self.flush()
+        names = self.app_names
+        for wall, event, app, used in iter_events(self.directory, start, end):
+            yield wall, event, names[app] if app < len(names) else "", used
+
+    def open_counts(self, start=None, end=None):
+        """各应用的打开次数"""
+        return Counter(app for _, event, app, _ in self.events(start, end)
+                       if event == EVENT_OPEN_APP)
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+每周时段规则模块
+把上课时间、睡觉时间等规则一次编译成 10080 分钟的位图，
+“现在是否允许使用”只需一次下标查找，并能给出下一次状态切换的时间
+"""
+
+import time
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+ALLOWED = b'\x01'
+BLOCKED = b'\x00'
+
+
+def parse_minute(text):
+    """把 "HH:MM" 转换为当天的分钟数，"24:00" 表示当天结束"""
+    hour, minute = text.split(':')
+    value = int(hour) * 60 + int(minute)
+    if not 0 <= value <= MINUTES_PER_DAY:
+        raise ValueError(f"无效的时间: {text}")
+    return value
+
+
+def apply_rule(mask, offset, rule):
+    """在 mask[offset:offset+1440] 范围内应用一条规则，支持跨午夜"""
+    start = parse_minute(rule.get("start", "00:00"))
+    end = parse_minute(rule.get("end", "24:00"))
+    value = 1 if rule.get("allow", False) else 0
+    if end > start:
+        spans = [(start, end)]
+    else:
+        # 例如 21:30-07:00，跨到第二天
+        spans = [(start, MINUTES_PER_DAY), (MINUTES_PER_DAY, MINUTES_PER_DAY + end)]
+    size = len(mask)
+    for span_start, span_end in spans:
+        for minute in range(offset + span_start, offset + span_end):
+            mask[minute % size] = value
+
+
+class WeeklySchedule:
+    """编译后的每周时段规则
+
+    rules: [{"days": [0, 1, 2, 3, 4], "start": "08:00", "end": "12:00", "allow": false}, ...]
+    overrides: {"2026-10-01": [{"start": "00:00", "end": "24:00", "allow": true}], ...}
+    days 中 0 表示星期一；规则按顺序应用，后面的覆盖前面的；默认全部允许。
+    """
+
+    def __init__(self, rules=None, overrides=None):
+        self.week = bytearray(ALLOWED * MINUTES_PER_WEEK)
+        for rule in rules or []:
+            for day in rule.get("days", range(7)):
+                apply_rule(self.week, day * MINUTES_PER_DAY, rule)
+
+        # 特定日期的覆盖规则，在当天的每周位图基础上修改
+        self.overrides = {}
+        for date, day_rules in (overrides or {}).items():
+            weekday = time.strptime(date, "%Y-%m-%d").tm_wday
+            day = bytearray(self.day_slice(weekday))
+            for rule in day_rules:
+                day_mask = bytearray(day + day)
+                apply_rule(day_mask, 0, rule)
+                # 覆盖规则只作用于当天，跨午夜部分丢弃
+                day = day_mask[:MINUTES_PER_DAY]
+            self.overrides[date] = bytes(day)
+
+    def day_slice(self, weekday):
+        """某个星期几的 1440 分钟位图"""
+        start = weekday * MINUTES_PER_DAY
+        return self.week[start:start + MINUTES_PER_DAY]
+
+    def day_mask(self, local):
+        """某一天（time.struct_time）实际生效的位图"""
+        override = self.overrides.get(time.strftime("%Y-%m-%d", local)) if self.overrides else None
+        if override is not None:
+            return override
+        return self.day_slice(local.tm_wday)
+
+    def is_allowed(self, now=None):
+        """当前时间是否允许使用"""
+        local = time.localtime(now)
+        minute = local.tm_hour * 60 + local.tm_min
+        if self.overrides:
+            return self.day_mask(local)[minute] == 1
+        return self.week[local.tm_wday * MINUTES_PER_DAY + minute] == 1
+
+    def seconds_until_transition(self, now=None):
+        """距离下一次允许/禁止状态切换的秒数，一周内没有切换时返回None"""
+        if now is None:
+            now = time.time()
+        local = time.localtime(now)
+        minute = local.tm_hour * 60 + local.tm_min
+        mask = self.day_mask(local)
+        current = mask[minute]
+        target = BLOCKED if current else ALLOWED
+
+        # 从当天开始逐日查找，最多查找8天
+        day_start = now - minute * 60 - local.tm_sec
+        start = minute + 1
+        for day_index in range(8):
+            position = mask.find(target, start)
+            if position >= 0:
+                transition = day_start + day_index * MINUTES_PER_DAY * 60 + position * 60
+                return max(0.0, transition - now)
+            next_day = time.localtime(day_start + (day_index + 1) * MINUTES_PER_DAY * 60 + 3600)
+            mask = self.day_mask(next_day)
+            start = 0
+        return None
\ No newline at end of file